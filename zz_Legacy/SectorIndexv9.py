@@ -1,23 +1,56 @@
 import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 import warnings
 import random
 import time
+import threading
 import os
 import pickle
 import json
+import io
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+try:
+    import lmdb
+except ImportError:
+    lmdb = None
+
+# Numeric kernels: AOT build (python sector_kernels.py) > numba JIT > numpy/pandas
+try:
+    from _sector_kernels import rsi_wilder, detect_reversals
+except ImportError:
+    try:
+        from numba import njit
+        import sector_kernels
+        rsi_wilder = njit(cache=True)(sector_kernels.rsi_wilder)
+        detect_reversals = njit(cache=True)(sector_kernels.detect_reversals)
+    except ImportError:
+        rsi_wilder = detect_reversals = None
 
 warnings.filterwarnings('ignore')
 
 # Cache settings
 CACHE_DIR = "./cache"
 os.makedirs(CACHE_DIR, exist_ok=True)
+LMDB_PATH = os.path.join(CACHE_DIR, "sectors.lmdb")
 CACHE_HOURS = 24*7
 MIN_BARS_REQUIRED = 200
 EXPECTED_MIN_BARS_5Y = 1100
 REVERSAL_PRICE_THRESHOLD = 10.0 # %
+RATE_LIMIT_PER_SEC = 2.0
+RATE_LIMIT_BURST = 6
 
 # ====================== CONFIGURATION ======================
 SECTORS = {
@@ -39,57 +72,161 @@ print("Loaded sectors:")
 for k, v in SECTORS.items():
     print(f"  {k:12} → {v['name']:12} ({v['ticker']})")
 
+# ====================== RATE LIMITING ======================
+class TokenBucket:
+    """Client-side rate limiter: only blocks once the burst allowance is spent."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def penalize(self, tokens):
+        """Go into debt after a 429 so the next acquire() waits longer."""
+        with self.lock:
+            self._refill()
+            self.tokens -= tokens
+
+
+RATE_LIMITER = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+
+
 # ====================== CACHED DATA FETCHING ======================
-def load_cached_data(ticker):
-    path = os.path.join(CACHE_DIR, f"{ticker}.pkl")
-    if not os.path.exists(path):
+def _cache_paths(ticker):
+    base = os.path.join(CACHE_DIR, ticker)
+    return f"{base}.feather", f"{base}.json", f"{base}.pkl"
+
+
+_lmdb_env = None
+
+def _cache_env():
+    """Single LMDB environment (one mmap) holding every ticker's cache."""
+    global _lmdb_env
+    if _lmdb_env is None and lmdb is not None and feather is not None:
+        _lmdb_env = lmdb.open(LMDB_PATH, map_size=512 << 20)
+    return _lmdb_env
+
+
+def read_cache_entry(ticker):
+    """Raw (df, fetch_time, etag) from disk, without any validity checks."""
+    env = _cache_env()
+    if env is not None:
+        with env.begin() as txn:
+            buf = txn.get(ticker.encode())
+            meta = txn.get(f"{ticker}:meta".encode())
+        if buf is not None and meta is not None:
+            df = feather.read_feather(io.BytesIO(buf)).set_index('Date')
+            df.index.name = None
+            meta = json.loads(meta)
+            return df, datetime.fromisoformat(meta['fetch_time']), meta.get('etag')
+
+    feather_path, meta_path, pkl_path = _cache_paths(ticker)
+    if feather is not None and os.path.exists(feather_path) and os.path.exists(meta_path):
+        # Arrow IPC is memory-mapped straight into numpy buffers
+        df = feather.read_table(feather_path, memory_map=True).to_pandas().set_index('Date')
+        df.index.name = None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return df, datetime.fromisoformat(meta['fetch_time']), meta.get('etag')
+
+    if not os.path.exists(pkl_path):
         return None
+    with open(pkl_path, 'rb') as f:
+        entry = pickle.load(f)
+    if len(entry) == 2:  # caches written before ETags were stored
+        entry = (*entry, None)
+    return entry
+
+
+def cache_content_problem(ticker, df):
+    """Why cached bars can't be reused or revalidated at all, or None if they can."""
+    if df is None or df.empty or len(df) < MIN_BARS_REQUIRED:
+        return f"Cache invalid for {ticker}"
+    
+    first_date = df.index.min()
+    years = (datetime.now().date() - first_date.date()).days / 365.25
+    if years < 4.7 or len(df) < EXPECTED_MIN_BARS_5Y:
+        return f"Cache for {ticker} < 5 years ({years:.1f}y)"
+    
+    return None
+
+
+def load_cached_data(ticker):
+    """(df, fetch_time, etag, fresh) for a usable cache entry, or None.
     
+    Entries older than CACHE_HOURS or with a last bar over a week old come
+    back with fresh=False: worth revalidating, not serving as-is."""
     try:
-        with open(path, 'rb') as f:
-            df, fetch_time = pickle.load(f)
-        
-        age_hours = (datetime.now() - fetch_time).total_seconds() / 3600
-        if age_hours > CACHE_HOURS:
-            print(f"Cache expired for {ticker} ({age_hours:.1f}h)")
+        entry = read_cache_entry(ticker)
+        if entry is None:
             return None
+        df, fetch_time, etag = entry
         
-        if df is None or df.empty or len(df) < MIN_BARS_REQUIRED:
-            print(f"Cache invalid for {ticker}")
+        problem = cache_content_problem(ticker, df)
+        if problem:
+            print(problem)
             return None
         
-        first_date = df.index.min()
-        years = (datetime.now().date() - first_date.date()).days / 365.25
-        if years < 4.7 or len(df) < EXPECTED_MIN_BARS_5Y:
-            print(f"Cache for {ticker} < 5 years ({years:.1f}y)")
-            return None
-        
-        last_date = df.index.max()
-        if (datetime.now().date() - last_date.date()).days > 7:
+        fresh = False
+        age_hours = (datetime.now() - fetch_time).total_seconds() / 3600
+        if age_hours > CACHE_HOURS:
+            print(f"Cache expired for {ticker} ({age_hours:.1f}h)")
+        elif (datetime.now().date() - df.index.max().date()).days > 7:
             print(f"Cache stale for {ticker}")
-            return None
-        
-        print(f"✓ Valid cache for {ticker}")
-        return df
+        else:
+            print(f"✓ Valid cache for {ticker}")
+            fresh = True
+        return df, fetch_time, etag, fresh
     
     except Exception as e:
         print(f"Cache load failed for {ticker}: {e}")
         return None
 
 
-def save_cached_data(ticker, df):
+def save_cached_data(ticker, df, etag=None):
     if df.empty: return
-    path = os.path.join(CACHE_DIR, f"{ticker}.pkl")
-    with open(path, 'wb') as f:
-        pickle.dump((df, datetime.now()), f)
+    feather_path, meta_path, pkl_path = _cache_paths(ticker)
+    fetch_time = datetime.now()
+    meta = {'fetch_time': fetch_time.isoformat(), 'etag': etag}
+    env = _cache_env()
+    if env is not None:
+        buf = io.BytesIO()
+        feather.write_feather(df.rename_axis('Date').reset_index(), buf, compression='lz4')
+        with env.begin(write=True) as txn:
+            txn.put(ticker.encode(), buf.getvalue())
+            txn.put(f"{ticker}:meta".encode(), json.dumps(meta).encode())
+    elif feather is not None:
+        feather.write_feather(df.rename_axis('Date').reset_index(), feather_path, compression='lz4')
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    else:
+        with open(pkl_path, 'wb') as f:
+            pickle.dump((df, fetch_time, etag), f)
     print(f"→ Saved cache for {ticker}")
 
 
 def get_stock_data(ticker, force_refresh=False):
-    if not force_refresh:
-        df = load_cached_data(ticker)
-        if df is not None:
-            return df
+    cached = None if force_refresh else load_cached_data(ticker)
+    if cached is not None and cached[3]:
+        return cached[0]
+    # An expired or stale but otherwise usable entry is revalidated with a
+    # conditional GET; anything else (forced, missing, too short) is fetched
+    # unconditionally
 
     ua_list = [
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
@@ -111,9 +248,26 @@ def get_stock_data(ticker, force_refresh=False):
                 'includeAdjustedClose': 'true'
             }
             headers = {'User-Agent': random.choice(ua_list)}
+            if cached is not None:
+                _, fetch_time, etag, _ = cached
+                if etag:
+                    headers['If-None-Match'] = etag
+                # When we last fetched (local naive time) as an HTTP date in GMT
+                headers['If-Modified-Since'] = format_datetime(
+                    fetch_time.astimezone(timezone.utc), usegmt=True)
 
             print(f"Fetching {ticker} (attempt {attempt}/5)...")
+            RATE_LIMITER.acquire()
             r = requests.get(url, params=params, headers=headers, timeout=25)
+            if r.status_code == 429:
+                # Each consecutive 429 doubles the debt, i.e. the next wait
+                print(f"Rate limited on {ticker}, backing off")
+                RATE_LIMITER.penalize(2 ** attempt)
+                continue
+            if r.status_code == 304 and cached is not None:
+                print(f"Not modified: {ticker} - keeping cache")
+                save_cached_data(ticker, cached[0], cached[2])
+                return cached[0]
             r.raise_for_status()
 
             data = r.json()
@@ -122,16 +276,27 @@ def get_stock_data(ticker, force_refresh=False):
             quote = result['indicators']['quote'][0]
             adj = result['indicators'].get('adjclose', [{}])[0].get('adjclose', quote.get('close', []))
 
-            df = pd.DataFrame({
-                'Open': quote.get('open'),
-                'High': quote.get('high'),
-                'Low': quote.get('low'),
-                'Close': adj if len(adj) == len(ts) else quote.get('close'),
-                'Volume': quote.get('volume'),
-            }, index=pd.to_datetime(ts, unit='s')).ffill().dropna(how='all')
+            # None → NaN happens inside numpy, no object-dtype column pass;
+            # a missing or null field becomes an all-NaN column of full length
+            def column(values):
+                if not values:
+                    return np.full(len(ts), np.nan)
+                return np.asarray(values, dtype=np.float64)
+
+            cols = {
+                'Open': column(quote.get('open')),
+                'High': column(quote.get('high')),
+                'Low': column(quote.get('low')),
+                'Close': column(adj if len(adj) == len(ts) else quote.get('close')),
+                'Volume': column(quote.get('volume')),
+            }
+            df = pd.DataFrame(cols, index=pd.to_datetime(ts, unit='s', cache=True))
+            if any(np.isnan(a).any() for a in cols.values()):
+                df = df.ffill()
+            df = df.dropna(how='all')
 
             print(f"Success: {ticker} - {len(df)} bars")
-            save_cached_data(ticker, df)
+            save_cached_data(ticker, df, r.headers.get('ETag'))
             return df
 
         except Exception as e:
@@ -143,32 +308,47 @@ def get_stock_data(ticker, force_refresh=False):
 
 
 # ====================== INDICATORS ======================
-def calculate_indicators(df, spy_df=None):
-    df = df.copy()
-    df['SMA_20']  = df['Close'].rolling(20, min_periods=1).mean()
-    df['SMA_50']  = df['Close'].rolling(50, min_periods=1).mean()
-    df['SMA_200'] = df['Close'].rolling(200, min_periods=1).mean()
-    df['Return']  = df['Close'].pct_change() * 100
-
-    delta = df['Close'].diff()
-    gain = delta.clip(lower=0).rolling(14).mean()
-    loss = (-delta.clip(upper=0)).rolling(14).mean()
-    rs = gain / loss.replace(0, np.nan)
-    df['RSI'] = 100 - 100 / (1 + rs)
-    df['RSI'] = df['RSI'].fillna(50)
-
+def calculate_indicators(df, spy_df=None, spy_pct=None):
+    # Collect new columns and attach them in one assign (one copy of df, not N)
+    close = df['Close']
+    new = {}
+    new['SMA_20']  = close.rolling(20, min_periods=1).mean()
+    new['SMA_50']  = close.rolling(50, min_periods=1).mean()
+    new['SMA_200'] = close.rolling(200, min_periods=1).mean()
+    new['Return']  = close.pct_change() * 100
+
+    if rsi_wilder is not None:
+        new['RSI'] = rsi_wilder(close.to_numpy(dtype=np.float64), 14)
+    else:
+        # Wilder's smoothing (alpha = 1/14), streamed in one pass
+        delta = close.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1/14, adjust=False).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1/14, adjust=False).mean()
+        rs = gain / loss.replace(0, np.nan)
+        new['RSI'] = (100 - 100 / (1 + rs)).fillna(50)
+
+    new['Alpha'] = new['Rel_Perf_150D'] = 0
     if spy_df is not None and not spy_df.empty:
         try:
-            aligned = spy_df['Close'].reindex(df.index).ffill()
+            spy_close = spy_df['Close']
+            if df.index.equals(spy_close.index):
+                # Same trading calendar as SPY: reuse its precomputed returns
+                aligned = spy_close
+                aligned_pct = spy_pct if spy_pct is not None else spy_close.pct_change() * 100
+            else:
+                aligned = spy_close.reindex(df.index).ffill()
+                aligned_pct = aligned.pct_change() * 100
             if aligned.notna().any():
-                df['Rel_Line'] = df['Close'] / aligned
-                df['Alpha'] = df['Return'] - aligned.pct_change() * 100
-                df['Rel_Perf_150D'] = df['Rel_Line'].pct_change(150) * 100
-                return df
+                new['Rel_Line'] = close / aligned
+                new['Alpha'] = new['Return'] - aligned_pct
+                new['Rel_Perf_150D'] = new['Rel_Line'].pct_change(150) * 100
         except:
             pass
-    df['Alpha'] = df['Rel_Perf_150D'] = 0
-    return df
+    # Every Series here is row-for-row with df, so attach plain arrays: no
+    # index alignment (which fails on duplicate dates), and assign replaces
+    # columns df already has instead of raising like join
+    return df.assign(**{k: v.to_numpy() if isinstance(v, pd.Series) else v
+                        for k, v in new.items()})
 
 
 def determine_trend_state(df):
@@ -186,20 +366,64 @@ def determine_trend_state(df):
     return "Neutral", "#8a94a6"
 
 
+SPARK_W, SPARK_H = 140, 40
+_SVG_PREFIX = f'<svg viewBox="0 0 {SPARK_W} {SPARK_H}" preserveAspectRatio="none"><polyline points="'
+_SVG_SUFFIX_TMPL = '" fill="none" stroke="{}" stroke-width="2"/></svg>'
+
+
 def create_sparkline(df, color):
     if df.empty: return ""
-    data = df['Close'].tail(60).tolist()
-    if not data: return ""
-    mn, mx = min(data), max(data)
+    data = df['Close'].tail(60).to_numpy(dtype=np.float64)
+    if not len(data): return ""
+    mn, mx = data.min(), data.max()
     rg = mx - mn or 1
-    points = ""
-    w, h = 140, 40
-    step = w / (len(data) - 1) if len(data) > 1 else 0
-    for i, v in enumerate(data):
-        x = i * step
-        y = h - ((v - mn) / rg * h)
-        points += f"{x},{y} "
-    return f'<svg viewBox="0 0 {w} {h}" preserveAspectRatio="none"><polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"/></svg>'
+    w, h = SPARK_W, SPARK_H
+    xs = np.linspace(0, w, len(data)) if len(data) > 1 else np.zeros(1)
+    ys = h - (data - mn) / rg * h
+    points = ' '.join(f"{x:.2f},{y:.2f}" for x, y in zip(xs.tolist(), ys.tolist()))
+    return f'{_SVG_PREFIX}{points}{_SVG_SUFFIX_TMPL.format(color)}'
+
+
+def _clean_round(arr, nd=2, fill=None):
+    # inf/nan -> fill in one numpy pass; JSON needs None, not NaN
+    a = np.asarray(arr, dtype=np.float64)
+    a = np.where(np.isfinite(a), np.round(a, nd), np.nan if fill is None else fill)
+    if orjson is not None:
+        # float32 is plenty for charting; orjson writes its shortest
+        # round-trip repr (1234.56, not 1234.5600000000002) and NaN as null
+        return a.astype(np.float32)
+    return [None if x != x else x for x in a.tolist()]
+
+
+def _detect_reversals_np(closes, sma50, lookback, threshold):
+    """numpy counterpart of sector_kernels.detect_reversals (NaN = no reversal)."""
+    moves = np.full(len(closes), np.nan)
+    # Only the change mask is consumed, so keep it off the DataFrame
+    slope = np.diff(sma50, prepend=sma50[0])
+    # int8 -1/0/+1 (NaN slope compares False both ways -> 0)
+    dir_arr = (slope > 0).astype(np.int8) - (slope < 0).astype(np.int8)
+    change = np.empty(len(dir_arr), dtype=bool)
+    change[0] = False
+    change[1:] = dir_arr[1:] != dir_arr[:-1]
+
+    for pos in np.flatnonzero(change):
+        # lookback window ending at (and including) the reversal bar
+        window = closes[max(0, pos - lookback + 1):pos + 1]
+        current_dir = dir_arr[pos]
+        close = closes[pos]
+
+        if current_dir > 0:  # Bullish reversal
+            prev_low = np.nanmin(window)
+            move_pct = (close - prev_low) / prev_low * 100
+            if move_pct >= threshold:
+                moves[pos] = move_pct
+
+        elif current_dir < 0:  # Bearish reversal
+            prev_high = np.nanmax(window)
+            move_pct = (close - prev_high) / prev_high * 100
+            if move_pct <= -threshold:
+                moves[pos] = move_pct
+    return moves
 
 
 # ====================== DASHBOARD ======================
@@ -209,63 +433,46 @@ def generate_dashboard(force_refresh=False):
     spy_df = get_stock_data('SPY', force_refresh)
     if spy_df.empty:
         print("WARNING: No SPY data")
+        spy_pct = None
+    else:
+        spy_pct = spy_df['Close'].pct_change() * 100
 
     sectors_data = []
 
     for key, config in SECTORS.items():
         print(f"Processing {config['name']} ({config['ticker']})")
         df = get_stock_data(config['ticker'], force_refresh)
-        time.sleep(random.uniform(1.0, 2.5))
 
         if df.empty or len(df) < 100:
             print(f"  → Skipped")
             continue
 
-        df = calculate_indicators(df, spy_df)
+        df = calculate_indicators(df, spy_df, spy_pct)
         trend_text, trend_color = determine_trend_state(df)
         last = df.iloc[-1]
 
         # Detect SMA 50 direction reversals
-        df['SMA50_Slope'] = df['SMA_50'].diff().fillna(0)
-        df['SMA50_Direction'] = np.sign(df['SMA50_Slope'])
-        df['Direction_Change'] = df['SMA50_Direction'] != df['SMA50_Direction'].shift(1).fillna(0)
+        closes = df['Close'].to_numpy(dtype=np.float64)
+        dates_str = df.index.strftime('%Y-%m-%d').to_numpy()
+        find_reversals = detect_reversals or _detect_reversals_np
+        moves = find_reversals(closes, df['SMA_50'].to_numpy(dtype=np.float64),
+                               30, REVERSAL_PRICE_THRESHOLD)
 
         reversals = []
-        for idx in df[df['Direction_Change']].index:
-            if idx == df.index[0]: continue
-
-            lookback = df.loc[:idx].tail(30)
-            if lookback.empty: continue
-
-            current_dir = df.at[idx, 'SMA50_Direction']
-
-            if current_dir > 0:  # Bullish reversal
-                prev_low = lookback['Close'].min()
-                move_pct = (df.at[idx, 'Close'] - prev_low) / prev_low * 100
-                if move_pct >= REVERSAL_PRICE_THRESHOLD:
-                    reversals.append({
-                        'date': idx.strftime('%Y-%m-%d'),
-                        'price': round(df.at[idx, 'Close'], 2),
-                        'signal': 'Bull',
-                        'move': round(move_pct, 2)
-                    })
-
-            elif current_dir < 0:  # Bearish reversal
-                prev_high = lookback['Close'].max()
-                move_pct = (df.at[idx, 'Close'] - prev_high) / prev_high * 100
-                if move_pct <= -REVERSAL_PRICE_THRESHOLD:
-                    reversals.append({
-                        'date': idx.strftime('%Y-%m-%d'),
-                        'price': round(df.at[idx, 'Close'], 2),
-                        'signal': 'Bear',
-                        'move': round(move_pct, 2)
-                    })
+        for pos in np.flatnonzero(~np.isnan(moves)):
+            move_pct = moves[pos]
+            reversals.append({
+                'date': dates_str[pos],
+                'price': round(float(closes[pos]), 2),
+                'signal': 'Bull' if move_pct > 0 else 'Bear',
+                'move': round(float(move_pct), 2)
+            })
 
         plot_data = {
-            'dates': df.index.strftime('%Y-%m-%d').tolist(),
-            'close': df['Close'].replace([np.inf, -np.inf, np.nan], None).round(2).tolist(),
-            'sma50': df['SMA_50'].replace([np.inf, -np.inf, np.nan], None).round(2).tolist(),
-            'volume': (df['Volume'] / 1e6).replace([np.inf, -np.inf, np.nan], 0).round(1).tolist(),
+            'dates': dates_str.tolist(),
+            'close': _clean_round(df['Close'].to_numpy()),
+            'sma50': _clean_round(df['SMA_50'].to_numpy()),
+            'volume': _clean_round(df['Volume'].to_numpy() / 1e6, 1, fill=0),
             'reversals': reversals,
             'ticker': config['ticker'],
             'name': config['name']
@@ -287,6 +494,15 @@ def generate_dashboard(force_refresh=False):
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
 
+    if orjson is not None:
+        sectors_json = orjson.dumps(
+            sectors_data,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            default=str,
+        ).decode()
+    else:
+        sectors_json = json.dumps(sectors_data, default=str)
+
     html = fr"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -327,7 +543,7 @@ def generate_dashboard(force_refresh=False):
     </div>
 
     <script>
-        const sectors = {json.dumps(sectors_data, default=str)};
+        const sectors = {sectors_json};
 
         function render() {{
             const grid = document.getElementById('grid');
@@ -3,6 +3,7 @@ import base64
 import tkinter as tk
 from tkinter import filedialog
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 def select_svg_files():
     """Open a file dialog to select multiple SVG files."""
@@ -15,29 +16,28 @@ def select_svg_files():
     )
     return list(file_paths) if file_paths else []
 
+def _encode_one(file_path):
+    """Read one SVG and build its library entry (runs in a worker process)."""
+    p = Path(file_path)
+    if p.suffix.lower() != '.svg':
+        return None
+    
+    b64 = base64.b64encode(p.read_bytes()).decode('ascii')
+    title = p.stem.replace("_", " ").title()
+    
+    return {
+        "data": f"data:image/svg+xml;base64,{b64}",
+        "title": title,
+        "aspect": "fixed",
+        "w": 100, "h": 100,
+        "style": "image;imageAspect=1;aspect=fixed;"
+    }
+
 def create_drawio_library(svg_paths: list[str], output_file: str = "selected_svgs_library.drawio"):
     """Generate a draw.io library from selected SVGs."""
-    entries = []
-    
-    for file_path in svg_paths:
-        p = Path(file_path)
-        if p.suffix.lower() != '.svg':
-            continue
-        
-        with open(p, "rb") as f:
-            data = f.read()
-            b64 = base64.b64encode(data).decode('ascii')
-        
-        title = p.stem.replace("_", " ").title()
-        
-        entry = {
-            "data": f"data:image/svg+xml;base64,{b64}",
-            "title": title,
-            "aspect": "fixed",
-            "w": 100, "h": 100,
-            "style": "image;imageAspect=1;aspect=fixed;"
-        }
-        entries.append(entry)
+    # Read + base64 of each file is independent, so spread it across cores
+    with ProcessPoolExecutor() as ex:
+        entries = [e for e in ex.map(_encode_one, svg_paths, chunksize=8) if e]
     
     if not entries:
         print("No SVGs selected. Library not created.")
@@ -123,9 +123,10 @@ def create_a4_report_drawio(output_file: str = "a4_report.drawio", num_pages: in
     print("Note: Open in draw.io. The 'pages' are arranged side by side on a large canvas.")
     print("To print as separate A4 pages, you may need to export or adjust print settings.")
 
-# Main execution
-svg_files = select_svg_files()
-if svg_files:
-    create_drawio_library(svg_files)
+# Main execution (guarded: worker processes re-import this module)
+if __name__ == "__main__":
+    svg_files = select_svg_files()
+    if svg_files:
+        create_drawio_library(svg_files)
 
-create_a4_report_drawio(side_by_side=True)  # Generate the A4 report separately
\ No newline at end of file
+    create_a4_report_drawio(side_by_side=True)  # Generate the A4 report separately
\ No newline at end of file
@@ -6,6 +6,7 @@ No modifications needed to the source file.
 """
 
 import os
+import io
 import sys
 import json
 import ast
@@ -16,23 +17,113 @@ import time
 import re
 import hashlib
 import argparse
+import functools
 import inspect
 import importlib.util
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 
+try:
+    from jinja2 import Environment, BaseLoader
+except ImportError:
+    Environment = None
+
 # [Keep all your existing THEMES, DEFAULTS, classes, etc. here]
 
 # ============================================================
 # SMART PYTHON ANALYZER - Extracts info from ANY Python file
 # ============================================================
 
+class _Collector:
+    """Single-pass AST collector; dispatches on node type instead of isinstance chains.
+    
+    Nodes come from ast.walk (breadth-first), so functions, classes and
+    variables keep the order the original walk produced: top-level defs
+    before methods and nested functions."""
+    
+    GUI_HINTS = ('gui', 'ui', 'window', 'app', 'main')
+    
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        self.variables = {}
+        self.has_gui = False
+        self.has_input = False
+        self.has_loops = False
+    
+    def visit_FunctionDef(self, node):
+        # Find all functions; render-ready fields are derived once here
+        args = [arg.arg for arg in node.args.args]
+        docstring = ast.get_docstring(node)
+        self.functions.append({
+            'name': node.name,
+            'args': args,
+            'args_str': ', '.join(args),
+            'docstring': docstring,
+            'docstring_html': f'<p>{docstring}</p>' if docstring else '',
+            'line': node.lineno
+        })
+        
+        # Check for GUI-related function names
+        lowered = node.name.lower()
+        if any(gui in lowered for gui in self.GUI_HINTS):
+            self.has_gui = True
+    
+    def visit_ClassDef(self, node):
+        # Find all classes
+        self.classes.append({
+            'name': node.name,
+            'methods': [item.name for item in node.body if isinstance(item, ast.FunctionDef)],
+            'docstring': ast.get_docstring(node)
+        })
+    
+    def visit_Assign(self, node):
+        # Find important variables (strings, numbers, lists)
+        value = node.value
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                if isinstance(value, ast.Constant):
+                    v = value.value
+                    if isinstance(v, str):
+                        self.variables[target.id] = f'"{v}"'
+                    elif isinstance(v, (int, float, complex)) and not isinstance(v, bool):
+                        self.variables[target.id] = str(v)
+                elif isinstance(value, ast.List):
+                    self.variables[target.id] = '[list]'
+    
+    def visit_Call(self, node):
+        # Check for input() calls
+        if isinstance(node.func, ast.Name) and node.func.id == 'input':
+            self.has_input = True
+    
+    def visit_For(self, node):
+        # Check for loops (could be used for displaying lists)
+        self.has_loops = True
+    
+    visit_While = visit_For
+    
+    def collect(self, tree):
+        handlers = {}  # node type -> bound visit_* method (or None)
+        for node in ast.walk(tree):
+            cls = node.__class__
+            try:
+                handler = handlers[cls]
+            except KeyError:
+                handler = handlers[cls] = getattr(self, 'visit_' + cls.__name__, None)
+            if handler is not None:
+                handler(node)
+        return self
+
+
 class PythonAnalyzer:
     """Analyzes any Python file and extracts information for the web app"""
     
     def __init__(self, file_path):
         self.file_path = Path(file_path)
+        self.stat = self.file_path.stat()
         self.source = self.file_path.read_text(encoding='utf-8')
         self.tree = ast.parse(self.source)
         self.functions = []
@@ -42,6 +133,9 @@ class PythonAnalyzer:
         self.has_gui = False
         self.has_input = False
         self.has_loops = False
+        # Memoized results of guess_app_type() / generate_description()
+        self._app_type = None
+        self._description = None
         
     def analyze(self):
         """Extract all useful information from the Python file"""
@@ -49,66 +143,32 @@ class PythonAnalyzer:
         # Get module docstring
         self.docstring = ast.get_docstring(self.tree)
         
-        for node in ast.walk(self.tree):
-            # Find all functions
-            if isinstance(node, ast.FunctionDef):
-                self.functions.append({
-                    'name': node.name,
-                    'args': [arg.arg for arg in node.args.args],
-                    'docstring': ast.get_docstring(node),
-                    'line': node.lineno
-                })
-                
-                # Check for GUI-related function names
-                if any(gui in node.name.lower() for gui in ['gui', 'ui', 'window', 'app', 'main']):
-                    self.has_gui = True
-            
-            # Find all classes
-            elif isinstance(node, ast.ClassDef):
-                class_info = {
-                    'name': node.name,
-                    'methods': [],
-                    'docstring': ast.get_docstring(node)
-                }
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        class_info['methods'].append(item.name)
-                self.classes.append(class_info)
-            
-            # Find important variables (strings, numbers, lists)
-            elif isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        if isinstance(node.value, ast.Str):
-                            self.variables[target.id] = f'"{node.value.s}"'
-                        elif isinstance(node.value, ast.Num):
-                            self.variables[target.id] = str(node.value.n)
-                        elif isinstance(node.value, ast.List):
-                            self.variables[target.id] = '[list]'
-            
-            # Check for input() calls
-            elif isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id == 'input':
-                    self.has_input = True
-            
-            # Check for loops (could be used for displaying lists)
-            elif isinstance(node, (ast.For, ast.While)):
-                self.has_loops = True
+        collector = _Collector().collect(self.tree)
+        self.functions = collector.functions
+        self.classes = collector.classes
+        self.variables = collector.variables
+        self.has_gui = collector.has_gui
+        self.has_input = collector.has_input
+        self.has_loops = collector.has_loops
+        self._app_type = None
+        self._description = None
         
         return self
     
     def guess_app_type(self):
         """Guess what kind of app this should be"""
-        if self.classes:
-            return "class-based"
-        elif len(self.functions) > 3:
-            return "multi-function"
-        elif self.has_input:
-            return "interactive"
-        elif self.has_gui:
-            return "gui"
-        else:
-            return "simple"
+        if self._app_type is None:
+            if self.classes:
+                self._app_type = "class-based"
+            elif len(self.functions) > 3:
+                self._app_type = "multi-function"
+            elif self.has_input:
+                self._app_type = "interactive"
+            elif self.has_gui:
+                self._app_type = "gui"
+            else:
+                self._app_type = "simple"
+        return self._app_type
     
     def get_main_function(self):
         """Find the main/entry point function"""
@@ -122,6 +182,9 @@ class PythonAnalyzer:
     
     def generate_description(self):
         """Generate a human-readable description"""
+        if self._description is not None:
+            return self._description
+        
         desc = []
         if self.docstring:
             desc.append(self.docstring.split('\n')[0])
@@ -133,105 +196,65 @@ class PythonAnalyzer:
         if self.variables:
             desc.append(f"Has {len(self.variables)} defined variables")
         
-        return ' • '.join(desc) if desc else "Python application"
+        self._description = ' • '.join(desc) if desc else "Python application"
+        return self._description
 
 
 # ============================================================
-# AUTO UI GENERATOR - Creates web UI from Python code
+# STATIC HTML FRAGMENTS - built once at import, not per page
 # ============================================================
 
-class AutoUIGenerator:
-    """Automatically generates a web UI from analyzed Python code"""
-    
-    def __init__(self, analyzer):
-        self.analyzer = analyzer
-        self.app_name = analyzer.file_path.stem.replace('_', ' ').replace('-', ' ').title()
-        
-    def generate_home_page(self):
-        """Generate the main/home page"""
-        content = []
-        
-        # App header
-        content.append(f"""
-        <div class="pywa-hero">
-            <h1>{self.app_name}</h1>
-            <p>{self.analyzer.generate_description()}</p>
-        </div>
-        """)
-        
-        # Overview cards
-        content.append('<div class="pywa-grid pywa-grid-2">')
-        
-        # Functions card
-        if self.analyzer.functions:
-            func_list = ''.join([
-                f'<li><code>{f["name"]}({", ".join(f["args"])})</code></li>'
-                for f in self.analyzer.functions[:5]
-            ])
-            content.append(f"""
-            <div class="pywa-card">
-                <h3>📋 Functions</h3>
-                <ul class="pywa-list">
-                    {func_list}
-                </ul>
-                {f'<p>... and {len(self.analyzer.functions)-5} more</p>' if len(self.analyzer.functions) > 5 else ''}
-            </div>
-            """)
-        
-        # Variables card
-        if self.analyzer.variables:
-            var_list = ''.join([
-                f'<li><code>{k} = {v}</code></li>'
-                for k, v in list(self.analyzer.variables.items())[:5]
-            ])
-            content.append(f"""
-            <div class="pywa-card">
-                <h3>🔧 Variables</h3>
-                <ul class="pywa-list">
-                    {var_list}
-                </ul>
-            </div>
-            """)
-        
-        content.append('</div>')  # Close grid
-        
-        # Code preview
-        content.append(f"""
-        <div class="pywa-card">
-            <h3>📄 Source Code</h3>
-            <pre style="background: var(--color-surface); padding: 15px; border-radius: var(--radius-sm); 
-                       overflow-x: auto; max-height: 400px; font-family: monospace; font-size: 0.9rem;">
-{self._get_code_preview()}
-            </pre>
-        </div>
-        """)
-        
-        return '\n'.join(content)
-    
-    def generate_functions_page(self):
-        """Generate a page showing all functions"""
-        content = ['<h2>Functions</h2>', '<div class="pywa-grid pywa-grid-2">']
-        
-        for func in self.analyzer.functions:
-            content.append(f"""
+_STEM_TRANS = str.maketrans('_-', '  ')
+_HERO_TMPL = '<div class="pywa-hero"><h1>{name}</h1><p>{desc}</p></div>\n'
+# Class names shared by every card/grid/button; interned so each emit reuses one object
+_CARD, _GRID2, _BTN_OUT = map(sys.intern, ('pywa-card', 'pywa-grid pywa-grid-2', 'pywa-btn pywa-btn-outline'))
+_CARD_OPEN = '<div class="' + _CARD + '">'
+_GRID_OPEN = '<div class="' + _GRID2 + '">\n'
+_GRID_CLOSE = '</div>\n'
+# Navigation is fully determined by two flags, so the items are shared read-only
+_NAV_HOME  = MappingProxyType({'label': 'Home', 'page': 'home', 'icon': '🏠'})
+_NAV_FUNCS = MappingProxyType({'label': 'Functions', 'page': 'functions', 'icon': '📋'})
+_NAV_INTER = MappingProxyType({'label': 'Interactive', 'page': 'interactive', 'icon': '🎮'})
+_NAV_ABOUT = MappingProxyType({'label': 'About', 'page': 'about', 'icon': 'ℹ️'})
+
+
+@functools.lru_cache(maxsize=4)
+def _nav_items(has_funcs, has_input):
+    return ((_NAV_HOME,)
+            + ((_NAV_FUNCS,) if has_funcs else ())
+            + ((_NAV_INTER,) if has_input else ())
+            + (_NAV_ABOUT,))
+
+
+_ABOUT_TPL = """
             <div class="pywa-card">
-                <h3>{func['name']}</h3>
-                <p><code>({', '.join(func['args'])})</code></p>
-                <p class="pywa-text-muted">Line {func['line']}</p>
-                {f'<p>{func["docstring"]}</p>' if func['docstring'] else ''}
-                <button class="pywa-btn pywa-btn-outline" 
-                        onclick="alert('Function {func["name"]} would execute here')">
-                    Run ▶
-                </button>
+                <h2>About this App</h2>
+                <p><strong>File:</strong> {file}</p>
+                <p><strong>Size:</strong> {size} bytes</p>
+                <p><strong>Functions:</strong> {nfunc}</p>
+                <p><strong>Classes:</strong> {nclass}</p>
+                <p><strong>Variables:</strong> {nvar}</p>
+                <p><strong>App type:</strong> {app_type}</p>
+                <hr class="pywa-divider">
+                <p>Generated with PyWA Compiler</p>
             </div>
-            """)
-        
-        content.append('</div>')
-        return '\n'.join(content)
-    
-    def generate_interactive_page(self):
-        """Generate an interactive page for apps with input()"""
-        content = ["""
+            """
+
+_CARD_TPL = (_CARD_OPEN + '<h3>%s</h3><p><code>(%s)</code></p>'
+             '<p class="pywa-text-muted">Line %d</p>%s'
+             '<button class="' + _BTN_OUT + '" onclick="alert(\'Function %s would execute here\')">Run ▶</button></div>\n')
+
+# Same markup as _CARD_TPL, compiled once when Jinja2 is available
+_FUNCS_PAGE_JINJA = (
+    '<h2>Functions</h2>\n' + _GRID_OPEN +
+    '{% for f in funcs %}' +
+    _CARD_OPEN + '<h3>{{ f.name }}</h3><p><code>({{ f.args_str }})</code></p>'
+    '<p class="pywa-text-muted">Line {{ f.line }}</p>{{ f.docstring_html }}'
+    '<button class="' + _BTN_OUT + '" onclick="alert(\'Function {{ f.name }} would execute here\')">Run ▶</button></div>\n'
+    '{% endfor %}'
+    '</div>\n')
+
+_INTERACTIVE_HTML = """
         <div class="pywa-card">
             <h2>Interactive Console</h2>
             <p>This app uses input(). Try it below:</p>
@@ -272,77 +295,223 @@ class AutoUIGenerator:
             document.getElementById('input').value = '';
         }
         </script>
-        """]
+"""
+
+
+# ============================================================
+# AUTO UI GENERATOR - Creates web UI from Python code
+# ============================================================
+
+class AutoUIGenerator:
+    """Automatically generates a web UI from analyzed Python code"""
+    
+    # Compiled once per class, shared by every instance
+    _FUNCS_PAGE = (Environment(loader=BaseLoader(), autoescape=False, keep_trailing_newline=True)
+                   .from_string(_FUNCS_PAGE_JINJA) if Environment is not None else None)
+    
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.app_name = analyzer.file_path.stem.translate(_STEM_TRANS).title()
+        self._preview = None
+        self._about = None
+        
+    def generate_home_page(self):
+        """Generate the main/home page"""
+        funcs = self.analyzer.functions
+        n_funcs = len(funcs)
+        buf = io.StringIO()
+        write = buf.write
+        
+        # App header
+        write(_HERO_TMPL.format(name=self.app_name, desc=self.analyzer.generate_description()))
+        
+        # Overview cards
+        write(_GRID_OPEN)
         
-        return '\n'.join(content)
+        # Functions card
+        if funcs:
+            write(_CARD_OPEN)
+            write('<h3>📋 Functions</h3><ul class="pywa-list">')
+            for f in funcs[:5]:
+                write('<li><code>')
+                write(f["name"])
+                write('(')
+                write(f["args_str"])
+                write(')</code></li>')
+            write('</ul>')
+            if n_funcs > 5:
+                write(f'<p>... and {n_funcs-5} more</p>')
+            write('</div>\n')
+        
+        # Variables card
+        if self.analyzer.variables:
+            write(_CARD_OPEN)
+            write('<h3>🔧 Variables</h3><ul class="pywa-list">')
+            for k, v in list(self.analyzer.variables.items())[:5]:
+                write('<li><code>')
+                write(k)
+                write(' = ')
+                write(v)
+                write('</code></li>')
+            write('</ul></div>\n')
+        
+        write(_GRID_CLOSE)
+        
+        # Code preview
+        write(_CARD_OPEN)
+        write('<h3>📄 Source Code</h3>'
+              '<pre style="background: var(--color-surface); padding: 15px; border-radius: var(--radius-sm); '
+              'overflow-x: auto; max-height: 400px; font-family: monospace; font-size: 0.9rem;">\n')
+        write(self._get_code_preview())
+        write('\n</pre></div>\n')
+        
+        return buf.getvalue()
+    
+    def generate_functions_page(self):
+        """Generate a page showing all functions"""
+        if self._FUNCS_PAGE is not None:
+            return self._FUNCS_PAGE.render(funcs=self.analyzer.functions)
+        
+        buf = io.StringIO()
+        write = buf.write
+        write('<h2>Functions</h2>\n')
+        write(_GRID_OPEN)
+        
+        for func in self.analyzer.functions:
+            write(_CARD_TPL % (func['name'], func['args_str'], func['line'], func['docstring_html'], func['name']))
+        
+        write(_GRID_CLOSE)
+        return buf.getvalue()
+    
+    def generate_interactive_page(self):
+        """Generate an interactive page for apps with input()"""
+        return _INTERACTIVE_HTML
     
     def _get_code_preview(self):
         """Get a preview of the source code"""
-        lines = self.analyzer.source.split('\n')
-        # Show first 20 lines or less
-        preview_lines = lines[:30]
-        if len(lines) > 30:
-            preview_lines.append('# ... (truncated)')
-        return '\n'.join(preview_lines)
+        if self._preview is None:
+            # Bounded split: scans only the first 30 line breaks, not the whole file
+            lines = self.analyzer.source.split('\n', 30)
+            preview = '\n'.join(lines[:30])
+            if len(lines) > 30:
+                preview += '\n# ... (truncated)'
+            self._preview = preview
+        return self._preview
+    
+    def generate_about_page(self):
+        """Generate the About page with file info (formatted once per generator)"""
+        if self._about is None:
+            analyzer = self.analyzer
+            self._about = _ABOUT_TPL.format_map({
+                'file': analyzer.file_path.name,
+                'size': f"{analyzer.stat.st_size:,}",
+                'nfunc': len(analyzer.functions),
+                'nclass': len(analyzer.classes),
+                'nvar': len(analyzer.variables),
+                'app_type': analyzer.guess_app_type(),
+            })
+        return self._about
     
     def generate_pages(self):
-        """Generate all pages for the app"""
+        """Generate all pages for the app
+        
+        Content is deferred: each page carries a 'content_fn' that renders
+        on first call and returns the cached HTML afterwards.
+        """
         pages = {}
         
         # Always have a home page
         pages['home'] = {
             'title': 'Home',
-            'content': self.generate_home_page()
+            'content_fn': functools.cache(self.generate_home_page)
         }
         
         # Functions page if there are functions
         if self.analyzer.functions:
             pages['functions'] = {
                 'title': 'Functions',
-                'content': self.generate_functions_page()
+                'content_fn': functools.cache(self.generate_functions_page)
             }
         
         # Interactive page if app uses input()
         if self.analyzer.has_input:
             pages['interactive'] = {
                 'title': 'Interactive',
-                'content': self.generate_interactive_page()
+                'content_fn': self.generate_interactive_page
             }
         
-        # About page with file info
         pages['about'] = {
             'title': 'About',
-            'content': f"""
-            <div class="pywa-card">
-                <h2>About this App</h2>
-                <p><strong>File:</strong> {self.analyzer.file_path.name}</p>
-                <p><strong>Size:</strong> {self.analyzer.file_path.stat().st_size:,} bytes</p>
-                <p><strong>Functions:</strong> {len(self.analyzer.functions)}</p>
-                <p><strong>Classes:</strong> {len(self.analyzer.classes)}</p>
-                <p><strong>Variables:</strong> {len(self.analyzer.variables)}</p>
-                <p><strong>App type:</strong> {self.analyzer.guess_app_type()}</p>
-                <hr class="pywa-divider">
-                <p>Generated with PyWA Compiler</p>
-            </div>
-            """
+            'content_fn': self.generate_about_page
         }
         
         return pages
     
     def generate_navigation(self):
         """Generate navigation items"""
-        nav = []
-        nav.append({'label': 'Home', 'page': 'home', 'icon': '🏠'})
-        
-        if self.analyzer.functions:
-            nav.append({'label': 'Functions', 'page': 'functions', 'icon': '📋'})
-        
-        if self.analyzer.has_input:
-            nav.append({'label': 'Interactive', 'page': 'interactive', 'icon': '🎮'})
-        
-        nav.append({'label': 'About', 'page': 'about', 'icon': 'ℹ️'})
-        
-        return nav
+        return list(_nav_items(bool(self.analyzer.functions), self.analyzer.has_input))
+
+
+# ============================================================
+# CACHED ASSETS - make_png/make_sw/make_manifest are pure, so
+# repeated compiles with the same inputs reuse earlier output
+# ============================================================
+
+@functools.lru_cache(maxsize=8)
+def cached_png(size, hex_color):
+    return make_png(size, hex_color)
+
+
+@functools.lru_cache(maxsize=8)
+def cached_sw(files_to_cache, version):
+    return make_sw(list(files_to_cache), version)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_manifest(config_items):
+    return make_manifest(dict(config_items))
+
+
+def cached_manifest(config):
+    try:
+        key = frozenset(config.items())
+    except TypeError:  # unhashable config value, skip the cache
+        return make_manifest(config)
+    return _cached_manifest(key)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_palette(theme, theme_color, accent):
+    return MappingProxyType(resolve_theme(
+        {"theme": theme, "theme_color": theme_color, "accent": accent}))
+
+
+def cached_theme(config):
+    """resolve_theme() with the preset merge memoized on the theme-relevant keys."""
+    theme = config.get("theme", "light")
+    if theme.lower() not in THEMES:  # custom/unknown: resolve_theme is a no-op
+        return config
+    merged = dict(_cached_palette(theme, config.get("theme_color"), config.get("accent")))
+    merged.update((k, v) for k, v in config.items() if v is not None)
+    merged["theme"] = theme.lower()
+    return merged
+
+
+# ============================================================
+# OUTPUT WRITING
+# ============================================================
+
+def write_if_changed(path, data):
+    """Write data (str or bytes) unless the file already holds exactly it; returns byte size."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        unchanged = path.stat().st_size == len(data) and path.read_bytes() == data
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        path.write_bytes(data)
+    return len(data)
 
 
 # ============================================================
@@ -398,13 +567,10 @@ class PyWACompiler:
         
         app = GeneratedApp()
         
-        # Add generated pages
+        # Add generated pages (rendered lazily by the HTML generator)
         for page_id, page_data in pages.items():
-            # Create a function that returns the content
-            def make_content_func(content):
-                return lambda self: content
             app._pages[page_id] = {
-                'fn': make_content_func(page_data['content']),
+                'content_fn': page_data['content_fn'],
                 'title': page_data['title']
             }
         
@@ -417,36 +583,44 @@ class PyWACompiler:
             self.config['short_name'] = ''.join(w[0] for w in words[:3])[:8]
         
         # Apply theme
-        self.config = resolve_theme(self.config)
+        self.config = cached_theme(self.config)
         
         # Step 5: Generate HTML
         print("  [4/6] Generating HTML...")
-        html = self.generator.generate(app, self.config)
+        raw = self.generator.generate(app, self.config)
         
         # Step 6: Optimize
         print("  [5/6] Optimizing for web...")
-        html = self.optimizer.optimize(html, self.config)
+        html = self.optimizer.optimize(raw, self.config)
+        del raw  # drop the pre-optimize copy before writing
+        # Encode once and keep only the bytes alive through the write
+        html = html.encode("utf-8")
         
         # Step 7: Write files
         print("  [6/6] Writing output files...")
         out = Path(self.config["output_dir"])
-        if out.exists():
-            shutil.rmtree(out)
-        out.mkdir(parents=True)
-        
-        (out / "index.html").write_text(html, encoding="utf-8")
-        (out / "manifest.json").write_text(make_manifest(self.config))
-        
-        files_to_cache = ["index.html", "manifest.json", "icon-192.png", "icon-512.png"]
-        (out / "sw.js").write_text(make_sw(files_to_cache, self.config["version"]))
-        
-        for size in [192, 512]:
-            (out / f"icon-{size}.png").write_bytes(make_png(size, self.config["theme_color"]))
-        
-        # Copy original Python file for reference
-        (out / "source.py").write_text(analyzer.source, encoding="utf-8")
+        out.mkdir(parents=True, exist_ok=True)
+        
+        files_to_cache = ("index.html", "manifest.json", "icon-192.png", "icon-512.png")
+        
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            # Icon sizes are independent and zlib releases the GIL while compressing
+            icons = {size: ex.submit(cached_png, size, self.config["theme_color"])
+                     for size in (192, 512)}
+            outputs = {
+                "index.html": html,
+                "manifest.json": cached_manifest(self.config),
+                "sw.js": cached_sw(files_to_cache, self.config["version"]),
+                # Copy original Python file for reference
+                "source.py": analyzer.source,
+            }
+            for size, fut in icons.items():
+                outputs[f"icon-{size}.png"] = fut.result()
+            
+            # Rebuilds in place: unchanged files are left untouched, and the
+            # independent writes overlap (the GIL is released during write(2))
+            total = sum(ex.map(lambda item: write_if_changed(out / item[0], item[1]), outputs.items()))
         
-        total = sum(f.stat().st_size for f in out.iterdir())
         print(f"\n  ✅ Compiled successfully! {total:,} bytes → ./{self.config['output_dir']}/")
         print(f"\n  🌐 Run: python -m http.server --directory {self.config['output_dir']} 8080")
         
@@ -465,7 +639,8 @@ def main():
     
     parser.add_argument("file", nargs="?", help="Python file to compile")
     parser.add_argument("--name", help="App name (optional)")
-    parser.add_argument("--theme", help="Theme: light|dark|glass|nature|sunset|ocean|custom")
+    parser.add_argument("--theme", type=str.lower, default="light",
+                        help="Theme: light|dark|glass|nature|sunset|ocean|custom")
     parser.add_argument("--color", help="Primary color (hex)")
     parser.add_argument("--accent", help="Accent color (hex)")
     parser.add_argument("--out", help="Output directory", default="pwa_output")
@@ -476,12 +651,13 @@ def main():
     
     # If no file specified, show file picker
     if not args.file:
-        from pathlib import Path
         print("\n  🔍 No file specified. Looking for Python files...")
         
         # Simple file picker
-        py_files = list(Path.cwd().glob("*.py"))
-        py_files = [f for f in py_files if f.name != "pywa.py"]
+        # scandir yields names without building a Path (and stat) per entry
+        with os.scandir(os.getcwd()) as it:
+            py_files = [e for e in it
+                        if e.name.endswith(".py") and e.name != "pywa.py" and e.is_file()]
         
         if not py_files:
             print("  ❌ No Python files found in current directory!")
@@ -489,16 +665,16 @@ def main():
             return
         
         if len(py_files) == 1:
-            args.file = str(py_files[0])
+            args.file = py_files[0].path
             print(f"  ✅ Found: {args.file}")
         else:
             print("\n  Multiple Python files found:")
-            for i, f in enumerate(py_files, 1):
-                print(f"    [{i}] {f.name}")
+            lines = [f"    [{i}] {f.name}" for i, f in enumerate(py_files, 1)]
+            sys.stdout.write('\n'.join(lines) + '\n')
             try:
                 choice = int(input("\n  Select file number: ")) - 1
                 if 0 <= choice < len(py_files):
-                    args.file = str(py_files[choice])
+                    args.file = py_files[choice].path
                 else:
                     print("  Invalid choice!")
                     return
@@ -507,17 +683,15 @@ def main():
                 return
     
     # Build config
-    config = {
-        "name": args.name,
-        "theme": args.theme or "light",
-        "theme_color": args.color,
-        "accent": args.accent,
-        "output_dir": args.out,
-        "version": "1.0.0"
-    }
-    
-    # Remove None values
-    config = {k: v for k, v in config.items() if v is not None}
+    # Single pass over the option pairs, dropping unset (None) values
+    config = {k: v for k, v in (
+        ("name", args.name),
+        ("theme", args.theme),
+        ("theme_color", args.color),
+        ("accent", args.accent),
+        ("output_dir", args.out),
+        ("version", "1.0.0"),
+    ) if v is not None}
     
     # Compile
     compiler = PyWACompiler(config)
@@ -527,7 +701,6 @@ def main():
     if args.serve:
         import http.server
         import socketserver
-        import os
         
         os.chdir(out_dir)
         print(f"\n  🌐 Starting server at http://localhost:{args.port}")
@@ -6,29 +6,33 @@ No modifications needed to your Python code!
 """
 
 import os
+import io
 import sys
 import json
 import ast
-import shutil
 import struct
 import zlib
 import time
 import re
+import string
 import hashlib
 import argparse
+import functools
+import itertools
 import textwrap
-import inspect
-import importlib.util
-import traceback
-import threading
-import http.server
-import socketserver
-import socket
-import subprocess
-import webbrowser
+# Server/browser modules (http.server, gzip, mimetypes, threading,
+# subprocess, webbrowser) are imported where used to keep build-only
+# CLI runs fast to start
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
 # ══════════════════════════════════════════════════════════════════
 #  BUILT-IN THEMES
 # ══════════════════════════════════════════════════════════════════
@@ -133,7 +137,21 @@ DEFAULTS = {
 #  THEME RESOLVER
 # ══════════════════════════════════════════════════════════════════
 def resolve_theme(config: dict) -> dict:
-    """Merge a named theme into config."""
+    """Merge a named theme into config (memoized on the config contents)."""
+    try:
+        key = frozenset(config.items())
+    except TypeError:  # unhashable value, merge uncached
+        return _resolve_theme(config)
+    # Callers mutate the result, so never hand out the cached dict itself
+    return dict(_resolve_theme_cached(key))
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_theme_cached(items):
+    return _resolve_theme(dict(items))
+
+
+def _resolve_theme(config: dict) -> dict:
     theme_name = config.get("theme", "light").lower()
 
     if theme_name == "custom" or theme_name not in THEMES:
@@ -149,42 +167,79 @@ def resolve_theme(config: dict) -> dict:
     return merged
 
 
+# Theme keys substituted into ResponsiveOptimizer.BASE_CSS
+_CSS_KEYS = ("bg_color", "theme_color", "accent", "surface", "border",
+             "text", "text_muted", "radius", "font", "shadow")
+_CSS_VARS = re.compile(r'\{(' + '|'.join(_CSS_KEYS) + r')\}')
+_HEAD_RE = re.compile(r'<head>', re.I)
+_BODY_RE = re.compile(r'<body(\s[^>]*)?>', re.I)
+
+
 # ══════════════════════════════════════════════════════════════════
 #  COMPATIBILITY CHECKER
 # ══════════════════════════════════════════════════════════════════
+# Open and close tags rewritten in one scan
+_CENTER_RE = re.compile(r'</?center>')
+
+
 class CompatibilityChecker:
+    # (search, message, fix) -- patterns are compiled once at class load.
+    # fix is None, a (compiled_sub, replacement) pair, or a callable for
+    # the plain str.replace case.
+    _I = re.IGNORECASE
     CHECKS = [
-        (r'<marquee',       "❌ <marquee> is deprecated",        lambda h: h.replace('<marquee', '<div class="pywa-marquee"')),
-        (r'<blink',         "❌ <blink> is deprecated",          lambda h: re.sub(r'<blink[^>]*>(.*?)</blink>', r'<span>\1</span>', h, flags=re.S)),
-        (r'<font ',         "❌ <font> tag is deprecated",       lambda h: re.sub(r'<font[^>]*>(.*?)</font>', r'<span>\1</span>', h, flags=re.S)),
-        (r'<center>',       "❌ <center> is deprecated",         lambda h: h.replace('<center>', '<div style="text-align:center">').replace('</center>', '</div>')),
-        (r'target=["\']_blank["\'](?!.*rel=)', "⚠️ _blank without rel=noopener",
-            lambda h: re.sub(r'(target=["\']_blank["\'])(?!.*?rel=)', r'\1 rel="noopener noreferrer"', h)),
-        (r'<img(?!.*?alt=)', "⚠️ <img> missing alt attribute",  lambda h: re.sub(r'(<img)(?![^>]*alt=)', r'\1 alt=""', h)),
-        (r'style="[^"]*color:\s*#[0-9a-fA-F]{3,6}[^"]*"', "ℹ️ Inline color found — prefer CSS variables", None),
-        (r'onclick=["\'][^"\']*eval\(', "🚨 eval() in onclick — security risk", None),
-        (r'document\.write\(', "❌ document.write() breaks modern parsers", None),
-        (r'var\s+', "ℹ️ var used — prefer const/let for modern JS", None),
-        (r'<table(?!.*role=)', "⚠️ Layout table — add role='presentation' if not data",
-            lambda h: re.sub(r'<table(?![^>]*role=)', '<table role="presentation"', h)),
-        (r'autofocus', "⚠️ autofocus can harm accessibility on mobile", None),
-        (r'user-scalable=no', "❌ user-scalable=no breaks accessibility",
-            lambda h: h.replace('user-scalable=no', 'user-scalable=yes')),
-        (r'user-scalable=0',  "❌ user-scalable=0 breaks accessibility",
-            lambda h: h.replace('user-scalable=0', 'user-scalable=yes')),
+        (re.compile(r'<marquee', _I),  "❌ <marquee> is deprecated",
+            lambda h: h.replace('<marquee', '<div class="pywa-marquee"')),
+        (re.compile(r'<blink', _I),    "❌ <blink> is deprecated",
+            (re.compile(r'<blink[^>]*>(.*?)</blink>', re.S), r'<span>\1</span>')),
+        (re.compile(r'<font ', _I),    "❌ <font> tag is deprecated",
+            (re.compile(r'<font[^>]*>(.*?)</font>', re.S), r'<span>\1</span>')),
+        (re.compile(r'<center>', _I),  "❌ <center> is deprecated",
+            (_CENTER_RE, lambda m: '</div>' if m.group().startswith('</') else '<div style="text-align:center">')),
+        (re.compile(r'target=["\']_blank["\'](?!.*rel=)', _I), "⚠️ _blank without rel=noopener",
+            (re.compile(r'(target=["\']_blank["\'])(?!.*?rel=)'), r'\1 rel="noopener noreferrer"')),
+        (re.compile(r'<img(?!.*?alt=)', _I), "⚠️ <img> missing alt attribute",
+            (re.compile(r'(<img)(?![^>]*alt=)'), r'\1 alt=""')),
+        (re.compile(r'style="[^"]*color:\s*#[0-9a-fA-F]{3,6}[^"]*"', _I), "ℹ️ Inline color found — prefer CSS variables", None),
+        (re.compile(r'onclick=["\'][^"\']*eval\(', _I), "🚨 eval() in onclick — security risk", None),
+        (re.compile(r'document\.write\(', _I), "❌ document.write() breaks modern parsers", None),
+        (re.compile(r'var\s+', _I), "ℹ️ var used — prefer const/let for modern JS", None),
+        (re.compile(r'<table(?!.*role=)', _I), "⚠️ Layout table — add role='presentation' if not data",
+            (re.compile(r'<table(?![^>]*role=)'), '<table role="presentation"')),
+        (re.compile(r'autofocus', _I), "⚠️ autofocus can harm accessibility on mobile", None),
+        (re.compile(r'user-scalable=no', _I), "❌ user-scalable=no breaks accessibility",
+            (re.compile(r'user-scalable=no'), 'user-scalable=yes')),
+        (re.compile(r'user-scalable=0', _I),  "❌ user-scalable=0 breaks accessibility",
+            (re.compile(r'user-scalable=0'), 'user-scalable=yes')),
     ]
+    # All detections in one scan: each rule is a named alternative inside a
+    # lookahead, so matches don't consume text and every position is tried.
+    # No two rules can match at the same start.  Auto-fixes can remove text
+    # a later rule matched (the style or onclick of a <blink>/<font> tag),
+    # so once a fix has changed the content the remaining rules are searched
+    # again on the fixed text.
+    _DETECT = re.compile(
+        '(?=' + '|'.join(f'(?P<c{i}>{c[0].pattern})' for i, c in enumerate(CHECKS)) + ')', _I)
+    del _I
 
     def check(self, html):
         issues  = []
         fixes   = []
         content = html
 
-        for pattern, message, fix_fn in self.CHECKS:
-            if re.search(pattern, content, re.IGNORECASE):
+        hits = {m.lastgroup for m in self._DETECT.finditer(content)}
+        fixed = False
+        for i, (pattern, message, fix) in enumerate(self.CHECKS):
+            if f'c{i}' in hits and (not fixed or pattern.search(content)):
                 issues.append(message)
-                if fix_fn:
+                if fix:
                     try:
-                        content = fix_fn(content)
+                        if callable(fix):
+                            content = fix(content)
+                        else:
+                            sub_pat, repl = fix
+                            content = sub_pat.sub(repl, content)
+                        fixed = content != html
                         fixes.append(f"  ✅ Auto-fixed: {message}")
                     except Exception:
                         fixes.append(f"  ⚠️  Could not auto-fix: {message}")
@@ -196,6 +251,8 @@ class CompatibilityChecker:
 #  RESPONSIVE OPTIMIZER
 # ══════════════════════════════════════════════════════════════════
 class ResponsiveOptimizer:
+    _css_cache = {}  # theme values tuple -> rendered BASE_CSS
+
     BASE_CSS = """
 /* ── PyWA Reset & Base ──────────────────────────────────── */
 *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
@@ -326,6 +383,16 @@ p { font-size: clamp(0.95rem, 2vw, 1.05rem); color: var(--color-text-muted); }
   transition: box-shadow var(--transition), transform var(--transition);
 }
 .pywa-card:hover { box-shadow: var(--shadow-md); transform: translateY(-2px); }
+.pywa-pre {
+  background: var(--color-surface);
+  padding: 15px;
+  border-radius: var(--radius-sm);
+  overflow-x: auto;
+  max-height: 400px;
+  font-family: monospace;
+  font-size: 0.85rem;
+}
+.pywa-pre-tall { max-height: 600px; }
 
 .pywa-btn {
   display: inline-flex;
@@ -452,39 +519,29 @@ p { font-size: clamp(0.95rem, 2vw, 1.05rem); color: var(--color-text-muted); }
 }
 """
 
-def optimize(self, html, config):
-    """Inject responsive meta tags and base CSS."""
-    
-    viewport = '<meta name="viewport" content="width=device-width, initial-scale=1.0, viewport-fit=cover" />'
-    mobile_capable = '<meta name="mobile-web-app-capable" content="yes" />'
-    apple_capable  = '<meta name="apple-mobile-web-app-capable" content="yes" />'
-    apple_title    = f'<meta name="apple-mobile-web-app-title" content="{config["name"]}" />'
-    apple_status   = '<meta name="apple-mobile-web-app-status-bar-style" content="black-translucent" />'
-    description    = f'<meta name="description" content="{config["name"]} — built with PyWA" />'
-    og_title       = f'<meta property="og:title" content="{config["name"]}" />'
-    og_type        = '<meta property="og:type" content="website" />'
-    charset        = '<meta charset="UTF-8" />'
-
-    # Get theme values
-    _t = config
-    
-    # FIX: Use simple string replacement instead of .format()
-    # Copy the BASE_CSS and replace placeholders one by one
-    base_css = self.BASE_CSS
+    def optimize(self, html, config):
+        """Inject responsive meta tags and base CSS."""
     
-    # Replace all placeholders with actual values
-    base_css = base_css.replace('{bg_color}', _t.get("bg_color", "#ffffff"))
-    base_css = base_css.replace('{theme_color}', _t.get("theme_color", "#1a1a2e"))
-    base_css = base_css.replace('{accent}', _t.get("accent", "#e94560"))
-    base_css = base_css.replace('{surface}', _t.get("surface", "#f5f5f5"))
-    base_css = base_css.replace('{border}', _t.get("border", "#e0e0e0"))
-    base_css = base_css.replace('{text}', _t.get("text", "#1a1a1a"))
-    base_css = base_css.replace('{text_muted}', _t.get("text_muted", "#666666"))
-    base_css = base_css.replace('{radius}', _t.get("radius", "12px"))
-    base_css = base_css.replace('{font}', _t.get("font", "'Segoe UI', system-ui, sans-serif"))
-    base_css = base_css.replace('{shadow}', _t.get("shadow", "0 2px 12px rgba(0,0,0,.08)"))
-
-    head_inject = f"""
+        viewport = '<meta name="viewport" content="width=device-width, initial-scale=1.0, viewport-fit=cover" />'
+        mobile_capable = '<meta name="mobile-web-app-capable" content="yes" />'
+        apple_capable  = '<meta name="apple-mobile-web-app-capable" content="yes" />'
+        apple_title    = f'<meta name="apple-mobile-web-app-title" content="{config["name"]}" />'
+        apple_status   = '<meta name="apple-mobile-web-app-status-bar-style" content="black-translucent" />'
+        description    = f'<meta name="description" content="{config["name"]} — built with PyWA" />'
+        og_title       = f'<meta property="og:title" content="{config["name"]}" />'
+        og_type        = '<meta property="og:type" content="website" />'
+        charset        = '<meta charset="UTF-8" />'
+
+        # Fill every theme placeholder in one pass over BASE_CSS; the rendered
+        # CSS depends only on the ten theme values, so reuse it across pages
+        _t = ChainMap({k: v for k, v in config.items() if v is not None}, DEFAULTS)
+        css_key = tuple(_t[k] for k in _CSS_KEYS)
+        base_css = self._css_cache.get(css_key)
+        if base_css is None:
+            base_css = _CSS_VARS.sub(lambda m: str(_t[m.group(1)]), self.BASE_CSS)
+            self._css_cache[css_key] = base_css
+
+        head_inject = f"""
   {charset}
   {viewport}
   {mobile_capable}
@@ -496,94 +553,58 @@ def optimize(self, html, config):
   {og_type}
   <style id="pywa-base">{base_css}</style>"""
 
-    if "<head>" in html:
-        html = html.replace("<head>", f"<head>{head_inject}", 1)
-    else:
-        html = f"<head>{head_inject}</head>" + html
+        html, found = _HEAD_RE.subn(lambda m: m.group(0) + head_inject, html, count=1)
+        if not found:
+            html = f"<head>{head_inject}</head>" + html
 
-    # Inject theme class onto <body>
-    theme_name = config.get("theme", "light")
-    auto_dark_class = "pywa-auto-dark" if theme_name in ("light","nature","ocean","sunset") else ""
-    body_class = f"pywa-theme-{theme_name} {auto_dark_class}".strip()
+        # Inject theme class onto <body>
+        theme_name = config.get("theme", "light")
+        auto_dark_class = "pywa-auto-dark" if theme_name in ("light","nature","ocean","sunset") else ""
+        body_class = f"pywa-theme-{theme_name} {auto_dark_class}".strip()
     
-    if "<body>" in html:
-        html = html.replace("<body>", f'<body class="{body_class}">', 1)
-    elif "<body " in html:
-        html = re.sub(r'<body ([^>]*)>', lambda m: f'<body class="{body_class}" {m.group(1)}>', html, count=1)
+        # Bare <body> and <body attrs...> handled by a single scan
+        html = _BODY_RE.sub(lambda m: f'<body class="{body_class}"{m.group(1) or ""}>', html, count=1)
+
+        return html
+
+    def optimize_stream(self, chunks, config, out):
+        """optimize() over a chunked document, written to `out` as it goes.
 
-    return html
+        <head> and <body> are both in the first chunk from
+        HTMLGenerator.iter_chunks, so only that chunk is rewritten; the page
+        chunks pass straight through and the full document never exists as
+        one string.
+        """
+        chunks = iter(chunks)
+        out.write(self.optimize(next(chunks, ""), config))
+        for chunk in chunks:
+            out.write(chunk)
 
 # ══════════════════════════════════════════════════════════════════
 #  HTML GENERATOR
 # ══════════════════════════════════════════════════════════════════
-class HTMLGenerator:
-    def generate(self, app_instance, config):
-        pages_html = ""
-        tab_btns = ""
-        desktop_links = ""
-
-        nav_items = getattr(app_instance, '_nav_items', [])
-        pages = getattr(app_instance, '_pages', {})
-
-        if not pages:
-            pages = {'home': {'fn': lambda self: '<p>No content</p>', 'title': 'Home'}}
-
-        first_page = list(pages.keys())[0]
-
-        # Auto-generate navigation if none provided
-        if not nav_items:
-            icons = ["⌂", "★", "✉", "☰", "♥", "⚙"]
-            for i, (name, meta) in enumerate(pages.items()):
-                nav_items.append({
-                    "label": meta.get('title', name.title()),
-                    "page": name,
-                    "icon": icons[i % len(icons)],
-                })
-
-        for item in nav_items:
-            active = 'active' if item["page"] == first_page else ''
-            tab_btns += f'''
-      <button class="pywa-tab-btn {active}" onclick="pywaNavigate('{item["page"]}')" id="tab-{item["page"]}">
-        <span class="tab-icon">{item["icon"]}</span>
-        <span>{item["label"]}</span>
-      </button>'''
-            desktop_links += f'<a href="#" onclick="pywaNavigate(\'{item["page"]}\');return false;">{item["label"]}</a>'
-
-        for name, meta in pages.items():
-            active = 'active' if name == first_page else ''
-            content_fn = meta.get('fn', lambda self: '')
-            content = content_fn(app_instance) or ''
-            pages_html += f'''
-    <div class="pywa-page {active}" id="page-{name}">
-      <main class="pywa-main">
-        {content}
-      </main>
-    </div>'''
-
-        extra_css = "\n".join(getattr(app_instance, '_styles', []))
-        extra_js = "\n".join(getattr(app_instance, '_scripts', []))
-
-        html = f"""<!DOCTYPE html>
+# Page shell, parsed once; HTMLGenerator only substitutes the per-build parts
+_SHELL_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
-  <title>{config.get('name', 'PyWA App')}</title>
+  <title>${name}</title>
   <link rel="manifest" href="manifest.json" />
-  <meta name="theme-color" content="{config.get('theme_color', '#1a1a2e')}" />
+  <meta name="theme-color" content="${theme_color}" />
   <link rel="apple-touch-icon" href="icon-192.png" />
-  {f'<style>{extra_css}</style>' if extra_css else ''}
+  ${extra_css_block}
 </head>
 <body>
 
   <nav class="pywa-navbar">
-    <span class="pywa-navbar-title">{config.get('name', 'PyWA App')}</span>
-    <div class="pywa-navbar-links">{desktop_links}</div>
+    <span class="pywa-navbar-title">${name}</span>
+    <div class="pywa-navbar-links">${desktop_links}</div>
   </nav>
 
-  {pages_html}
+  ${pages_html}
 
   <div class="pywa-tab-nav">
     <div class="pywa-tab-nav-inner">
-      {tab_btns}
+      ${tab_btns}
     </div>
   </div>
 
@@ -594,76 +615,213 @@ class HTMLGenerator:
   </div>
 
   <script>
-    function pywaNavigate(page) {{
+    function pywaNavigate(page) {
       document.querySelectorAll('.pywa-page').forEach(p => p.classList.remove('active'));
       document.querySelectorAll('.pywa-tab-btn').forEach(b => b.classList.remove('active'));
       const pg = document.getElementById('page-' + page);
       const tb = document.getElementById('tab-' + page);
       if (pg) pg.classList.add('active');
       if (tb) tb.classList.add('active');
-      window.history.pushState({{page}}, '', '#' + page);
-    }}
+      window.history.pushState({page}, '', '#' + page);
+    }
 
-    window.addEventListener('popstate', e => {{
+    window.addEventListener('popstate', e => {
       if (e.state && e.state.page) pywaNavigate(e.state.page);
-    }});
+    });
 
     let pywaInstallEvent = null;
-    window.addEventListener('beforeinstallprompt', e => {{
+    window.addEventListener('beforeinstallprompt', e => {
       e.preventDefault();
       pywaInstallEvent = e;
       document.getElementById('pywa-install-banner').classList.add('show');
-    }});
+    });
 
-    function pywaInstall() {{
+    function pywaInstall() {
       if (!pywaInstallEvent) return;
       pywaInstallEvent.prompt();
-      pywaInstallEvent.userChoice.then(() => {{
+      pywaInstallEvent.userChoice.then(() => {
         pywaInstallEvent = null;
         document.getElementById('pywa-install-banner').classList.remove('show');
-      }});
-    }}
+      });
+    }
 
-    if ('serviceWorker' in navigator) {{
+    if ('serviceWorker' in navigator) {
       navigator.serviceWorker.register('sw.js')
         .then(() => console.log('[PyWA] Service worker ready'))
         .catch(e => console.warn('[PyWA] SW error', e));
-    }}
+    }
 
-    window.addEventListener('load', () => {{
+    window.addEventListener('load', () => {
       const hash = window.location.hash.replace('#', '');
       if (hash) pywaNavigate(hash);
-    }});
+    });
 
-    {extra_js}
+    ${extra_js}
   </script>
 </body>
-</html>"""
-        return html
+</html>""")
+
+
+# Split around the page list so pages can be streamed between head and tail
+_SHELL_HEAD, _SHELL_TAIL = (string.Template(t) for t in _SHELL_TEMPLATE.template.split('${pages_html}'))
+
+
+def render_nav(nav_items, active_page):
+    """(tab bar buttons, desktop links) HTML for the given nav items."""
+    # Accumulate nav fragments in lists and join once (no quadratic +=)
+    tab_parts = []
+    link_parts = []
+    for item in nav_items:
+        page, icon, label = item["page"], item["icon"], item["label"]
+        active = 'active' if page == active_page else ''
+        tab_parts.append(f'''
+      <button class="pywa-tab-btn {active}" onclick="pywaNavigate('{page}')" id="tab-{page}">
+        <span class="tab-icon">{icon}</span>
+        <span>{label}</span>
+      </button>''')
+        link_parts.append(f'<a href="#" onclick="pywaNavigate(\'{page}\');return false;">{label}</a>')
+    return "".join(tab_parts), "".join(link_parts)
+
+
+class HTMLGenerator:
+    def generate(self, app_instance, config, out=None):
+        """Full page HTML; written chunk by chunk to `out` instead when given."""
+        if out is None:
+            return "".join(self.iter_chunks(app_instance, config))
+        for chunk in self.iter_chunks(app_instance, config):
+            out.write(chunk)
+
+    def iter_chunks(self, app_instance, config):
+        """Yield the document as shell head (through <body> and nav), one chunk per page, then tail."""
+        nav_items = getattr(app_instance, '_nav_items', [])
+        pages = getattr(app_instance, '_pages', {})
+
+        if not pages:
+            pages = {'home': {'fn': lambda self: '<p>No content</p>', 'title': 'Home'}}
+
+        first_page = list(pages.keys())[0]
+
+        # Apps built by PyWACompiler bring their nav pre-rendered; otherwise
+        # render it from _nav_items (auto-generated if none provided)
+        nav_html = getattr(app_instance, '_nav_html', None)
+        if nav_html:
+            tab_btns, desktop_links = nav_html
+        else:
+            if not nav_items:
+                icons = ["⌂", "★", "✉", "☰", "♥", "⚙"]
+                for i, (name, meta) in enumerate(pages.items()):
+                    nav_items.append({
+                        "label": meta.get('title', name.title()),
+                        "page": name,
+                        "icon": icons[i % len(icons)],
+                    })
+            tab_btns, desktop_links = render_nav(nav_items, first_page)
+
+        extra_css = "\n".join(getattr(app_instance, '_styles', []))
+        extra_js = "\n".join(getattr(app_instance, '_scripts', []))
+
+        yield _SHELL_HEAD.substitute(
+            name=config.get('name', 'PyWA App'),
+            theme_color=config.get('theme_color', '#1a1a2e'),
+            extra_css_block=f'<style>{extra_css}</style>' if extra_css else '',
+            desktop_links=desktop_links,
+        )
+
+        for name, meta in pages.items():
+            active = 'active' if name == first_page else ''
+            if 'content' in meta:
+                content = meta['content'] or ''
+            elif 'content_fn' in meta:
+                content = meta['content_fn']() or ''
+            else:
+                content_fn = meta.get('fn', lambda self: '')
+                content = content_fn(app_instance) or ''
+            yield f'''
+    <div class="pywa-page {active}" id="page-{name}">
+      <main class="pywa-main">
+        {content}
+      </main>
+    </div>'''
+
+        yield _SHELL_TAIL.substitute(tab_btns=tab_btns, extra_js=extra_js)
 
 
 # ══════════════════════════════════════════════════════════════════
 #  ASSET GENERATORS
 # ══════════════════════════════════════════════════════════════════
-def make_png(size, hex_color):
+ICON_CACHE_DIR = Path.home() / ".cache" / "pywa"
+# Stamped on cached analysis and pages: a digest of this file, so any change
+# to the analyzer, templates or escaping invalidates entries older code wrote
+PYWA_BUILD = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+
+_HEX_COLOR_RE = re.compile(r'#[0-9a-fA-F]{6}')
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@functools.lru_cache(maxsize=32)
+def make_png(size, hex_color, level=1):
+    """Solid-color PNG icon; memoized in-process and on disk across runs.
+
+    Uniform rows stay a few KB even at zlib level 1 (fastest), so that is
+    the default; release builds pass 9 for the smallest file.
+    """
+    if len(hex_color) == 4 and hex_color[0] == '#':
+        hex_color = '#' + ''.join(c * 2 for c in hex_color[1:])  # CSS shorthand
+    if not _HEX_COLOR_RE.fullmatch(hex_color):
+        return _render_png(size, hex_color, level)  # not a safe cache file name
+    cached = ICON_CACHE_DIR / f"icon-{size}-{hex_color[1:].lower()}-z{level}.png"
+    try:
+        data = cached.read_bytes()
+    except OSError:
+        data = None
+    if data is not None and _is_valid_png(data, size):
+        return data
+    data = _render_png(size, hex_color, level)
+    try:
+        ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cached.write_bytes(data)
+    except OSError:
+        pass  # read-only home etc. -- the in-process cache still applies
+    return data
+
+
+def _is_valid_png(data, size):
+    """Signature, chunk lengths and CRCs intact, IHDR size x size, IEND last."""
+    if not data.startswith(_PNG_SIGNATURE):
+        return False
+    pos, names = len(_PNG_SIGNATURE), []
+    while pos + 12 <= len(data):
+        length, = struct.unpack_from(">I", data, pos)
+        end = pos + 12 + length
+        if end > len(data):
+            return False
+        body = data[pos + 4:end - 4]  # chunk type + data, what the CRC covers
+        if zlib.crc32(body) & 0xFFFFFFFF != struct.unpack_from(">I", data, end - 4)[0]:
+            return False
+        if body[:4] == b"IHDR" and (length < 8 or struct.unpack_from(">II", body, 4) != (size, size)):
+            return False
+        names.append(body[:4])
+        pos = end
+    return pos == len(data) and names[:1] == [b"IHDR"] and names[-1:] == [b"IEND"]
+
+
+def _render_png(size, hex_color, level):
     r, g, b = int(hex_color[1:3], 16), int(hex_color[3:5], 16), int(hex_color[5:7], 16)
-    raw = b""
-    for _ in range(size):
-        row = b"\x00"
-        for _ in range(size):
-            row += bytes([r, g, b, 255])
-        raw += row
+    # Build one row, then repeat it; bytes * n is a single C memcpy loop
+    row = b"\x00" + bytes((r, g, b, 255)) * size
+    raw = row * size
     def chunk(name, data):
         crc = zlib.crc32(name + data) & 0xFFFFFFFF
         return struct.pack(">I", len(data)) + name + data + struct.pack(">I", crc)
     ihdr = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
-    return (b"\x89PNG\r\n\x1a\n"
+    return (_PNG_SIGNATURE
             + chunk(b"IHDR", ihdr)
-            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IDAT", zlib.compress(raw, level))
             + chunk(b"IEND", b""))
 
 
-def make_manifest(config):
+def make_manifest(config, compact=False):
     return json.dumps({
         "name": config.get("name", "PyWA App"),
         "short_name": config.get("short_name", config.get("name", "PyWA")[:12]),
@@ -677,12 +835,18 @@ def make_manifest(config):
             {"src": "icon-192.png", "sizes": "192x192", "type": "image/png", "purpose": "any maskable"},
             {"src": "icon-512.png", "sizes": "512x512", "type": "image/png", "purpose": "any maskable"},
         ]
-    }, indent=2)
+    }, **({"separators": (",", ":")} if compact else {"indent": 2}))
+
 
+@functools.lru_cache(maxsize=32)
+def _cache_tag(version, source_hash):
+    # Cache name busts on source changes when the analyzer's hash is given
+    if source_hash:
+        return source_hash[:6]
+    return hashlib.blake2b(version.encode(), digest_size=3).hexdigest()
 
-def make_sw(file_list, version):
-    files = json.dumps(file_list, indent=4)
-    return f"""const CACHE = 'pywa-{version}-{hashlib.md5(version.encode()).hexdigest()[:6]}';
+
+_SW_TEMPLATE = """const CACHE = 'pywa-{version}-{tag}';
 const FILES = {files};
 
 self.addEventListener('install', e => {{
@@ -717,14 +881,121 @@ self.addEventListener('fetch', e => {{
 """
 
 
+def make_sw(file_list, version, source_hash=None, pretty=False):
+    # The SW is machine-read; compact FILES unless --pretty asks otherwise
+    files = json.dumps(file_list, indent=4) if pretty else json.dumps(file_list, separators=(",", ":"))
+    return _SW_TEMPLATE.format_map({
+        "version": version,
+        "tag": _cache_tag(version, source_hash),
+        "files": files,
+    })
+
+
 # ══════════════════════════════════════════════════════════════════
 #  PYTHON ANALYZER - Extracts info from ANY Python file
 # ══════════════════════════════════════════════════════════════════
+class _Collector:
+    """Single AST pass; dispatches on node type, no isinstance chain.
+
+    Nodes come from ast.walk (breadth-first), so functions, classes and
+    variables keep the baseline order: top-level defs before methods and
+    nested functions, with methods listed among the functions."""
+
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        self.variables = {}
+        self.has_input = False
+        self.has_loops = False
+
+    def visit_FunctionDef(self, node):
+        self.functions.append({
+            'name': node.name,
+            'args': [arg.arg for arg in node.args.args],
+            'docstring': ast.get_docstring(node),
+            'line': node.lineno
+        })
+
+    def visit_ClassDef(self, node):
+        self.classes.append({
+            'name': node.name,
+            'methods': [item.name for item in node.body if isinstance(item, ast.FunctionDef)],
+            'docstring': ast.get_docstring(node)
+        })
+
+    def visit_Assign(self, node):
+        value = node.value
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                if isinstance(value, ast.Constant):
+                    v = value.value
+                    if isinstance(v, str):
+                        self.variables[target.id] = f'"{v}"'
+                    elif isinstance(v, (int, float, complex)) and not isinstance(v, bool):
+                        self.variables[target.id] = str(v)
+                elif isinstance(value, ast.List):
+                    self.variables[target.id] = f'[{len(value.elts)} items]'
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == 'input':
+            self.has_input = True
+
+    def visit_For(self, node):
+        self.has_loops = True
+
+    visit_While = visit_For
+
+    def collect(self, tree):
+        handlers = {}  # node type -> bound visit_* method (or None)
+        for node in ast.walk(tree):
+            cls = node.__class__
+            try:
+                handler = handlers[cls]
+            except KeyError:
+                handler = handlers[cls] = getattr(self, 'visit_' + cls.__name__, None)
+            if handler is not None:
+                handler(node)
+        return self
+
+
+# Analysis results reused across builds: in-process by (path, mtime_ns, size),
+# across processes in one ~/.cache/pywa/analysis/<source hash>.json per source
+_ANALYZER_CACHE = {}
+ANALYSIS_CACHE_DIR = ICON_CACHE_DIR / "analysis"
+_FACTS = ('docstring', 'functions', 'classes', 'variables', 'has_input', 'has_loops')
+
+
+def _load_analysis(source_hash):
+    try:
+        entry = json.loads((ANALYSIS_CACHE_DIR / f"{source_hash}.json").read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get('build') != PYWA_BUILD:
+        return None  # written by another PyWA version
+    return entry.get('facts')
+
+
+def _save_analysis(source_hash, facts):
+    try:
+        ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (ANALYSIS_CACHE_DIR / f"{source_hash}.json").write_text(
+            json.dumps({'build': PYWA_BUILD, 'facts': facts}), encoding='utf-8')
+    except OSError:
+        pass
+
+
 class PythonAnalyzer:
-    def __init__(self, file_path):
+    def __init__(self, file_path, parse=True):
         self.file_path = Path(file_path)
-        self.source = self.file_path.read_text(encoding='utf-8')
-        self.tree = ast.parse(self.source)
+        # One read: the bytes feed the parser, the hash and the source.py copy
+        self.source_bytes = self.file_path.read_bytes()
+        self.source = self.source_bytes.decode('utf-8')
+        self.source_hash = hashlib.blake2b(self.source_bytes, digest_size=16).hexdigest()
+        self.tree = ast.parse(self.source_bytes, filename=str(self.file_path)) if parse else None
+        # Split once; the home preview and About line count both read these
+        self._lines = self.source.split('\n')
+        self._line_count = len(self._lines)
+        self._preview = '\n'.join(self._lines[:30]) + ('\n# ... (truncated)' if self._line_count > 30 else '')
         self.functions = []
         self.classes = []
         self.variables = {}
@@ -732,45 +1003,37 @@ class PythonAnalyzer:
         self.has_input = False
         self.has_loops = False
         
+    @classmethod
+    def for_path(cls, file_path):
+        """Analyzed instance for file_path, skipping ast.parse when the source is unchanged."""
+        path = Path(file_path)
+        st = path.stat()
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+        inst = _ANALYZER_CACHE.get(key)
+        if inst is not None:
+            return inst
+        
+        inst = cls(path, parse=False)
+        facts = _load_analysis(inst.source_hash)
+        if facts is not None:
+            for name in _FACTS:
+                setattr(inst, name, facts[name])
+        else:
+            inst.tree = ast.parse(inst.source_bytes, filename=str(path))
+            inst.analyze()
+            _save_analysis(inst.source_hash, {name: getattr(inst, name) for name in _FACTS})
+        _ANALYZER_CACHE[key] = inst
+        return inst
+    
     def analyze(self):
         self.docstring = ast.get_docstring(self.tree)
         
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.FunctionDef):
-                self.functions.append({
-                    'name': node.name,
-                    'args': [arg.arg for arg in node.args.args],
-                    'docstring': ast.get_docstring(node),
-                    'line': node.lineno
-                })
-            
-            elif isinstance(node, ast.ClassDef):
-                methods = []
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        methods.append(item.name)
-                self.classes.append({
-                    'name': node.name,
-                    'methods': methods,
-                    'docstring': ast.get_docstring(node)
-                })
-            
-            elif isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        if isinstance(node.value, ast.Str):
-                            self.variables[target.id] = f'"{node.value.s}"'
-                        elif isinstance(node.value, ast.Num):
-                            self.variables[target.id] = str(node.value.n)
-                        elif isinstance(node.value, ast.List):
-                            self.variables[target.id] = f'[{len(node.value.elts)} items]'
-            
-            elif isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id == 'input':
-                    self.has_input = True
-            
-            elif isinstance(node, (ast.For, ast.While)):
-                self.has_loops = True
+        c = _Collector().collect(self.tree)
+        self.functions = c.functions
+        self.classes = c.classes
+        self.variables = c.variables
+        self.has_input = c.has_input
+        self.has_loops = c.has_loops
         
         return self
     
@@ -807,46 +1070,193 @@ class PythonAnalyzer:
 # ══════════════════════════════════════════════════════════════════
 #  AUTO UI GENERATOR
 # ══════════════════════════════════════════════════════════════════
+# HTML-escape user text (names, docstrings, source) in one C-level pass
+_HTML_ESC = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})
+
+
+def _esc(s):
+    return s.translate(_HTML_ESC)
+
+
+# Page templates, compiled once by a shared Jinja2 Environment when Jinja2 is
+# installed; AutoUIGenerator falls back to its StringIO builders otherwise
+# One card per function on the non-Jinja path (str.format_map; fields pre-escaped)
+_FUNC_CARD = """\n
+            <div class="pywa-card">
+                <h3>{name}</h3>
+                <p><strong>Parameters:</strong> <code>{args}</code></p>
+                <p><strong>Line:</strong> {line}</p>
+                {doc}
+                <button class="pywa-btn pywa-btn-outline" 
+                        onclick="alert('Function {name} would execute here')">
+                    Run ▶
+                </button>
+            </div>
+            """
+
+_PAGE_TEMPLATES = {
+    'home.html': """
+        <div class="pywa-hero">
+            <h1>{{ app_name|esc }}</h1>
+            <p>{{ description|esc }}</p>
+        </div>
+        
+<div class="pywa-grid pywa-grid-2">{% if funcs %}
+
+            <div class="pywa-card">
+                <h3>📋 Functions</h3>
+                <ul class="pywa-list">
+                    {% for f in funcs[:8] %}<li><code>{{ f.name|esc }}({{ f.args|join(', ')|esc }})</code></li>{% endfor %}
+                </ul>
+                {% if funcs|length > 8 %}<p>... and {{ funcs|length - 8 }} more</p>{% endif %}
+                <button class="pywa-btn pywa-btn-outline" style="margin-top:10px;" 
+                        onclick="pywaNavigate('functions')">View All →</button>
+            </div>
+            {% endif %}{% if classes %}
+
+            <div class="pywa-card">
+                <h3>📚 Classes</h3>
+                <ul class="pywa-list">
+                    {% for c in classes[:5] %}<li><code>{{ c.name|esc }}</code> ({{ c.methods|length }} methods)</li>{% endfor %}
+                </ul>
+            </div>
+            {% endif %}{% if variables %}
+
+            <div class="pywa-card">
+                <h3>🔧 Variables</h3>
+                <ul class="pywa-list">
+                    {% for k, v in variables %}<li><code>{{ k|esc }} = {{ v|esc }}</code></li>{% endfor %}
+                </ul>
+            </div>
+            {% endif %}
+</div>
+
+        <div class="pywa-card">
+            <h3>📄 Source Code Preview</h3>
+            <pre class="pywa-pre">
+{{ preview|esc }}
+            </pre>
+        </div>
+        """,
+    'functions.html': """<h2>All Functions</h2>
+<div class="pywa-grid pywa-grid-2">{% for func in funcs %}
+
+            <div class="pywa-card">
+                <h3>{{ func.name|esc }}</h3>
+                <p><strong>Parameters:</strong> <code>{{ func.args|join(', ')|esc if func.args else 'none' }}</code></p>
+                <p><strong>Line:</strong> {{ func.line }}</p>
+                {% if func.docstring %}<p><em>{{ func.docstring|esc }}</em></p>{% endif %}
+                <button class="pywa-btn pywa-btn-outline" 
+                        onclick="alert('Function {{ func.name|esc }} would execute here')">
+                    Run ▶
+                </button>
+            </div>
+            {% endfor %}
+</div>""",
+    'source.html': """
+        <div class="pywa-card">
+            <h2>Source Code</h2>
+            <p>File: {{ name|esc }}</p>
+            <pre class="pywa-pre pywa-pre-tall">
+{{ source|esc }}
+            </pre>
+        </div>
+        """,
+    'about.html': """
+        <div class="pywa-card">
+            <h2>About</h2>
+            <p><strong>File:</strong> {{ name|esc }}</p>
+            <p><strong>Size:</strong> {{ size }} bytes</p>
+            <p><strong>Lines:</strong> {{ lines }}</p>
+            <p><strong>Functions:</strong> {{ analyzer.functions|length }}</p>
+            <p><strong>Classes:</strong> {{ analyzer.classes|length }}</p>
+            <p><strong>Variables:</strong> {{ analyzer.variables|length }}</p>
+            <p><strong>App type:</strong> {{ app_type }}</p>
+            <hr class="pywa-divider">
+            <p>Generated with PyWA Compiler</p>
+        </div>
+        """,
+}
+
+_JINJA_ENV = (jinja2.Environment(loader=jinja2.DictLoader(_PAGE_TEMPLATES), autoescape=False,
+                                 keep_trailing_newline=True, cache_size=-1)
+              if jinja2 is not None else None)
+if _JINJA_ENV is not None:
+    _JINJA_ENV.filters['esc'] = _esc
+
+# Sources larger than this aren't inlined into index.html; the Source page
+# fetches the source.py that compile() writes next to it instead
+INLINE_SOURCE_MAX = 50 * 1024
+
+_SOURCE_FETCH_PAGE = """
+        <div class="pywa-card">
+            <h2>Source Code</h2>
+            <p>File: {name}</p>
+            <pre id="src-view" class="pywa-pre pywa-pre-tall">Loading...</pre>
+            <script>
+            fetch('source.py').then(r => r.text()).then(t => {{
+                document.getElementById('src-view').textContent = t;
+            }});
+            </script>
+        </div>
+        """
+
+
 class AutoUIGenerator:
+    # Compiled once per class and shared by every instance
+    _TEMPLATES = ({name: _JINJA_ENV.get_template(name) for name in _PAGE_TEMPLATES}
+                  if _JINJA_ENV is not None else None)
+    
     def __init__(self, analyzer):
         self.analyzer = analyzer
         self.app_name = analyzer.file_path.stem.replace('_', ' ').replace('-', ' ').title()
         
     def generate_home_page(self):
-        content = []
+        if self._TEMPLATES:
+            a = self.analyzer
+            return self._TEMPLATES['home.html'].render(
+                app_name=self.app_name, description=a.generate_description(),
+                funcs=a.functions, classes=a.classes,
+                variables=list(itertools.islice(a.variables.items(), 8)),
+                preview=self._get_code_preview())
         
-        content.append(f"""
+        buf = io.StringIO()
+        write = buf.write
+        
+        write(f"""
         <div class="pywa-hero">
-            <h1>{self.app_name}</h1>
-            <p>{self.analyzer.generate_description()}</p>
+            <h1>{_esc(self.app_name)}</h1>
+            <p>{_esc(self.analyzer.generate_description())}</p>
         </div>
         """)
         
-        content.append('<div class="pywa-grid pywa-grid-2">')
+        write('\n<div class="pywa-grid pywa-grid-2">')
         
-        if self.analyzer.functions:
-            func_list = ''.join([
-                f'<li><code>{f["name"]}({", ".join(f["args"])})</code></li>'
-                for f in self.analyzer.functions[:8]
-            ])
-            content.append(f"""
+        funcs = self.analyzer.functions
+        n_funcs = len(funcs)
+        if funcs:
+            func_list = ''.join(
+                f'<li><code>{_esc(f["name"])}({_esc(", ".join(f["args"]))})</code></li>'
+                for f in funcs[:8]
+            )
+            write(f"""\n
             <div class="pywa-card">
                 <h3>📋 Functions</h3>
                 <ul class="pywa-list">
                     {func_list}
                 </ul>
-                {f'<p>... and {len(self.analyzer.functions)-8} more</p>' if len(self.analyzer.functions) > 8 else ''}
+                {f'<p>... and {n_funcs-8} more</p>' if n_funcs > 8 else ''}
                 <button class="pywa-btn pywa-btn-outline" style="margin-top:10px;" 
                         onclick="pywaNavigate('functions')">View All →</button>
             </div>
             """)
         
         if self.analyzer.classes:
-            class_list = ''.join([
-                f'<li><code>{c["name"]}</code> ({len(c["methods"])} methods)</li>'
+            class_list = ''.join(
+                f'<li><code>{_esc(c["name"])}</code> ({len(c["methods"])} methods)</li>'
                 for c in self.analyzer.classes[:5]
-            ])
-            content.append(f"""
+            )
+            write(f"""\n
             <div class="pywa-card">
                 <h3>📚 Classes</h3>
                 <ul class="pywa-list">
@@ -856,11 +1266,11 @@ class AutoUIGenerator:
             """)
         
         if self.analyzer.variables:
-            var_list = ''.join([
-                f'<li><code>{k} = {v}</code></li>'
-                for k, v in list(self.analyzer.variables.items())[:8]
-            ])
-            content.append(f"""
+            var_list = ''.join(
+                f'<li><code>{_esc(k)} = {_esc(v)}</code></li>'
+                for k, v in itertools.islice(self.analyzer.variables.items(), 8)
+            )
+            write(f"""\n
             <div class="pywa-card">
                 <h3>🔧 Variables</h3>
                 <ul class="pywa-list">
@@ -869,43 +1279,42 @@ class AutoUIGenerator:
             </div>
             """)
         
-        content.append('</div>')
+        write('\n</div>\n')
         
-        content.append(f"""
+        write("""
         <div class="pywa-card">
             <h3>📄 Source Code Preview</h3>
-            <pre style="background: var(--color-surface); padding: 15px; border-radius: var(--radius-sm); 
-                       overflow-x: auto; max-height: 400px; font-family: monospace; font-size: 0.85rem;">
-{self._get_code_preview()}
+            <pre class="pywa-pre">
+""")
+        write(_esc(self._get_code_preview()))
+        write("""
             </pre>
         </div>
         """)
         
-        return '\n'.join(content)
+        return buf.getvalue()
     
     def generate_functions_page(self):
         if not self.analyzer.functions:
             return "<p>No functions found</p>"
+        if self._TEMPLATES:
+            return self._TEMPLATES['functions.html'].render(funcs=self.analyzer.functions)
         
-        content = ['<h2>All Functions</h2>', '<div class="pywa-grid pywa-grid-2">']
+        buf = io.StringIO()
+        write = buf.write
+        write('<h2>All Functions</h2>\n<div class="pywa-grid pywa-grid-2">')
         
+        card = _FUNC_CARD.format_map
         for func in self.analyzer.functions:
-            args_html = ', '.join(func['args']) if func['args'] else 'none'
-            content.append(f"""
-            <div class="pywa-card">
-                <h3>{func['name']}</h3>
-                <p><strong>Parameters:</strong> <code>{args_html}</code></p>
-                <p><strong>Line:</strong> {func['line']}</p>
-                {f'<p><em>{func["docstring"]}</em></p>' if func['docstring'] else ''}
-                <button class="pywa-btn pywa-btn-outline" 
-                        onclick="alert('Function {func["name"]} would execute here')">
-                    Run ▶
-                </button>
-            </div>
-            """)
+            write(card({
+                'name': _esc(func['name']),
+                'args': _esc(', '.join(func['args'])) if func['args'] else 'none',
+                'line': func['line'],
+                'doc': f'<p><em>{_esc(func["docstring"])}</em></p>' if func['docstring'] else '',
+            }))
         
-        content.append('</div>')
-        return '\n'.join(content)
+        write('\n</div>')
+        return buf.getvalue()
     
     def generate_interactive_page(self):
         if not self.analyzer.has_input:
@@ -933,6 +1342,10 @@ class AutoUIGenerator:
         </div>
         
         <script>
+        // Compiled once when the page loads, not on every runPython() call
+        const RE_PRINT = /\\(['"](.*)['"]\\)/;
+        const RE_MATH = /^[0-9+\\-*/()]+$/;
+        
         function runPython() {
             const input = document.getElementById('input').value;
             const console = document.getElementById('console');
@@ -952,11 +1365,11 @@ class AutoUIGenerator:
             
             // Add simulated output
             if (input.startsWith('print(')) {
-                const match = input.match(/\\(['"](.*)['"]\\)/);
+                const match = input.match(RE_PRINT);
                 if (match) {
                     html += '<div style="color: var(--color-accent);">' + match[1] + '</div>';
                 }
-            } else if (input.match(/^[0-9+\\-*/()]+$/)) {
+            } else if (RE_MATH.test(input)) {
                 try {
                     const result = eval(input);
                     html += '<div style="color: var(--color-accent);">' + result + '</div>';
@@ -986,24 +1399,39 @@ class AutoUIGenerator:
         """
     
     def generate_source_page(self):
-        return f"""
+        if len(self.analyzer.source_bytes) > INLINE_SOURCE_MAX:
+            return _SOURCE_FETCH_PAGE.format(name=_esc(self.analyzer.file_path.name))
+        if self._TEMPLATES:
+            return self._TEMPLATES['source.html'].render(
+                name=self.analyzer.file_path.name, source=self.analyzer.source)
+        
+        buf = io.StringIO()
+        buf.write(f"""
         <div class="pywa-card">
             <h2>Source Code</h2>
-            <p>File: {self.analyzer.file_path.name}</p>
-            <pre style="background: var(--color-surface); padding: 15px; border-radius: var(--radius-sm); 
-                       overflow-x: auto; max-height: 600px; font-family: monospace; font-size: 0.85rem;">
-{self.analyzer.source}
+            <p>File: {_esc(self.analyzer.file_path.name)}</p>
+            <pre class="pywa-pre pywa-pre-tall">
+""")
+        buf.write(_esc(self.analyzer.source))
+        buf.write("""
             </pre>
         </div>
-        """
+        """)
+        return buf.getvalue()
     
     def generate_about_page(self):
+        if self._TEMPLATES:
+            a = self.analyzer
+            return self._TEMPLATES['about.html'].render(
+                analyzer=a, name=a.file_path.name, size=f"{len(a.source_bytes):,}",
+                lines=a._line_count, app_type=a.guess_app_type())
+        
         return f"""
         <div class="pywa-card">
             <h2>About</h2>
-            <p><strong>File:</strong> {self.analyzer.file_path.name}</p>
-            <p><strong>Size:</strong> {self.analyzer.file_path.stat().st_size:,} bytes</p>
-            <p><strong>Lines:</strong> {len(self.analyzer.source.split('\\n'))}</p>
+            <p><strong>File:</strong> {_esc(self.analyzer.file_path.name)}</p>
+            <p><strong>Size:</strong> {len(self.analyzer.source_bytes):,} bytes</p>
+            <p><strong>Lines:</strong> {self.analyzer._line_count}</p>
             <p><strong>Functions:</strong> {len(self.analyzer.functions)}</p>
             <p><strong>Classes:</strong> {len(self.analyzer.classes)}</p>
             <p><strong>Variables:</strong> {len(self.analyzer.variables)}</p>
@@ -1014,41 +1442,39 @@ class AutoUIGenerator:
         """
     
     def _get_code_preview(self):
-        lines = self.analyzer.source.split('\n')
-        preview_lines = lines[:30]
-        if len(lines) > 30:
-            preview_lines.append('# ... (truncated)')
-        return '\n'.join(preview_lines)
+        return self.analyzer._preview
     
     def generate_pages(self):
+        # Each page renders on first call to its content_fn and is memoized,
+        # so a consumer that emits only some pages never builds the others
+        lazy = lambda fn: functools.lru_cache(maxsize=1)(fn)
         pages = {}
         
         pages['home'] = {
             'title': 'Home',
-            'content': self.generate_home_page()
+            'content_fn': lazy(self.generate_home_page)
         }
         
         if self.analyzer.functions:
             pages['functions'] = {
                 'title': 'Functions',
-                'content': self.generate_functions_page()
+                'content_fn': lazy(self.generate_functions_page)
             }
         
-        interactive = self.generate_interactive_page()
-        if interactive:
+        if self.analyzer.has_input:
             pages['interactive'] = {
                 'title': 'Console',
-                'content': interactive
+                'content_fn': lazy(self.generate_interactive_page)
             }
         
         pages['source'] = {
             'title': 'Source',
-            'content': self.generate_source_page()
+            'content_fn': lazy(self.generate_source_page)
         }
         
         pages['about'] = {
             'title': 'About',
-            'content': self.generate_about_page()
+            'content_fn': lazy(self.generate_about_page)
         }
         
         return pages
@@ -1066,23 +1492,24 @@ class AutoUIGenerator:
         nav.append({'label': 'About', 'page': 'about', 'icon': 'ℹ️'})
         
         return nav
+    
+    def generate_navigation_html(self):
+        """Nav markup rendered once at compile time; HTMLGenerator uses it as-is."""
+        return render_nav(self.generate_navigation(), 'home')
 
 
 # ══════════════════════════════════════════════════════════════════
 #  FILE PICKER
 # ══════════════════════════════════════════════════════════════════
-def _pick_from_list(files):
+def _pick_from_list(files, cwd=None):
     if not files:
         return None
     
+    cwd = str(cwd or Path.cwd())
     print("\n  📁 Found Python files:\n")
     
     for i, f in enumerate(files, 1):
-        try:
-            display = f.relative_to(Path.cwd())
-        except ValueError:
-            display = f
-        print(f"    [{i}] {display}")
+        print(f"    [{i}] {os.path.relpath(f, cwd)}")
     
     print("\n    [0] Cancel")
     
@@ -1093,14 +1520,16 @@ def _pick_from_list(files):
             if choice == "0":
                 return None
             
-            try:
-                idx = int(choice) - 1
-                if 0 <= idx < len(files):
-                    return files[idx]
-                else:
-                    print(f"  Please enter a number between 1 and {len(files)}")
-            except ValueError:
+            # isdecimal() accepts exactly what int() parses as a plain digit
+            # string (isdigit() would let "²" through to a ValueError)
+            if not choice.isdecimal():
                 print("  Please enter a valid number")
+                continue
+            
+            idx = int(choice) - 1
+            if 0 <= idx < len(files):
+                return files[idx]
+            print(f"  Please enter a number between 1 and {len(files)}")
                 
         except (EOFError, KeyboardInterrupt):
             print("\n")
@@ -1113,28 +1542,120 @@ def pick_py_file():
     print(f"\n  🔍 Searching for Python files in: {base}")
     
     skip_dirs = {"__pycache__", ".git", ".venv", "venv", "env", "node_modules"}
+    skip_files = {"pywa.py", "pywa_v0p2.py"}
     
+    # One recursive walk; skipped directories are pruned before descent
     found = []
-    for f in base.glob("*.py"):
-        if f.name != "pywa.py" and f.name != "pywa_v0p2.py":
-            found.append(f)
+    for root, dirs, files in os.walk(base):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+        found.extend(Path(root, f) for f in sorted(files)
+                     if f.endswith(".py") and f not in skip_files)
     
     if not found:
-        print(f"\n  ❌ No Python files found in current directory")
+        print(f"\n  ❌ No Python files found under current directory")
         return None
     
-    return _pick_from_list(found)
+    return _pick_from_list(found, base)
+
+
+# ══════════════════════════════════════════════════════════════════
+#  OUTPUT WRITING - rebuilds touch only files whose bytes changed
+# ══════════════════════════════════════════════════════════════════
+def _holds(path, data):
+    """True if path exists with exactly these bytes (one open + fstat, no path stat)."""
+    try:
+        with open(path, "rb") as fh:
+            return os.fstat(fh.fileno()).st_size == len(data) and fh.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def write_if_changed(path, data):
+    """Write str/bytes to path unless it already holds exactly that."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if not _holds(path, data):
+        path.write_bytes(data)
+
+
+def replace_if_changed(tmp, path):
+    """Move a freshly written tmp file over path, or drop it if path is identical."""
+    try:
+        same = tmp.stat().st_size == path.stat().st_size and tmp.read_bytes() == path.read_bytes()
+    except FileNotFoundError:
+        same = False
+    if same:
+        tmp.unlink()
+    else:
+        os.replace(tmp, path)
+
+
+def link_if_changed(src, path, data):
+    """Make path a copy of src (whose bytes are data): a hard link when possible, written otherwise."""
+    if _holds(path, data):  # also covers path already being a link to src
+        return
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, path)
+    except OSError:
+        path.write_bytes(data)
 
 
 # ══════════════════════════════════════════════════════════════════
 #  PYWA COMPILER
 # ══════════════════════════════════════════════════════════════════
+PAGE_CACHE_DIR = ICON_CACHE_DIR / "pages"
+
+
 class PyWACompiler:
     def __init__(self, config=None):
         self.config = {**DEFAULTS, **(config or {})}
         self.checker = CompatibilityChecker()
         self.optimizer = ResponsiveOptimizer()
         self.generator = HTMLGenerator()
+        self._page_cache = {}  # source key -> {"pages": ..., "nav_html": ...}
+    
+    def _page_key(self, analyzer):
+        # Pages also depend on the PyWA build and on which renderer produced them
+        renderer = "jinja2" if jinja2 is not None else "str"
+        return hashlib.blake2b(
+            f"{PYWA_BUILD}:{renderer}:{analyzer.source_hash}:{analyzer.file_path.name}".encode(),
+            digest_size=16).hexdigest()
+    
+    def _pages_for(self, analyzer, ui_gen):
+        """Pages and nav HTML for this source, reused while its bytes and name are unchanged.
+        
+        On a miss the pages are lazy (content_fn); _store_pages persists them
+        once they have been rendered."""
+        key = self._page_key(analyzer)
+        hit = self._page_cache.get(key)
+        if hit is None:
+            try:
+                hit = json.loads((PAGE_CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))
+                hit["nav_html"]
+            except (OSError, ValueError, KeyError):
+                return ui_gen.generate_pages(), ui_gen.generate_navigation_html()
+            self._page_cache[key] = hit
+        return hit["pages"], hit["nav_html"]
+    
+    def _store_pages(self, analyzer, pages, nav_html):
+        key = self._page_key(analyzer)
+        if key in self._page_cache:
+            return
+        # content_fn is memoized, so pages already emitted aren't rendered again
+        hit = {"pages": {pid: {"title": p["title"],
+                               "content": p["content"] if "content" in p else p["content_fn"]()}
+                         for pid, p in pages.items()},
+               "nav_html": nav_html}
+        self._page_cache[key] = hit
+        try:
+            PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            (PAGE_CACHE_DIR / f"{key}.json").write_text(json.dumps(hit), encoding="utf-8")
+        except OSError:
+            pass
     
     def _banner(self):
         print("""
@@ -1150,64 +1671,77 @@ class PyWACompiler:
         print(f"  📦 Output : {self.config['output_dir']}/\n")
         
         print("  [1/5] Analyzing Python code...")
-        analyzer = PythonAnalyzer(src).analyze()
+        analyzer = PythonAnalyzer.for_path(src)
         print(f"     ✅ Found {len(analyzer.functions)} functions, {len(analyzer.classes)} classes")
         
         print("  [2/5] Generating UI...")
         ui_gen = AutoUIGenerator(analyzer)
-        pages = ui_gen.generate_pages()
-        nav_items = ui_gen.generate_navigation()
+        pages, nav_html = self._pages_for(analyzer, ui_gen)
         
         print("  [3/5] Building app...")
         
         class GeneratedApp:
             def __init__(self):
                 self._pages = {}
-                self._nav_items = nav_items
+                self._nav_html = nav_html
                 self._styles = []
                 self._scripts = []
         
         app = GeneratedApp()
-        
-        for page_id, page_data in pages.items():
-            def make_content_func(content):
-                return lambda self: content
-            app._pages[page_id] = {
-                'fn': make_content_func(page_data['content']),
-                'title': page_data['title']
-            }
+        # Cached pages carry 'content', fresh ones a lazy 'content_fn';
+        # HTMLGenerator handles both, so pass them through as-is
+        app._pages = pages
         
         if not self.config.get('name'):
             self.config['name'] = ui_gen.app_name
         
         if not self.config.get('short_name'):
-            words = self.config['name'].split()
-            self.config['short_name'] = ''.join(w[0] for w in words[:3])[:8]
+            # Initials of the first three words; maxsplit stops the scan there
+            words = self.config['name'].split(None, 3)[:3]
+            self.config['short_name'] = ''.join(w[0] for w in words)
         
         self.config = resolve_theme(self.config)
         
-        print("  [4/5] Generating HTML...")
-        html = self.generator.generate(app, self.config)
-        html = self.optimizer.optimize(html, self.config)
-        
-        print("  [5/5] Writing files...")
+        # Update in place: unchanged outputs keep their mtimes, so the
+        # browser and OS page cache stay warm across rebuilds
         out = Path(self.config["output_dir"])
-        if out.exists():
-            shutil.rmtree(out)
-        out.mkdir(parents=True)
-        
-        (out / "index.html").write_text(html, encoding="utf-8")
-        (out / "manifest.json").write_text(make_manifest(self.config))
+        out.mkdir(parents=True, exist_ok=True)
         
+        cfg = self.config
         files_to_cache = ["index.html", "manifest.json", "icon-192.png", "icon-512.png"]
-        (out / "sw.js").write_text(make_sw(files_to_cache, self.config["version"]))
+        if len(analyzer.source_bytes) > INLINE_SOURCE_MAX:
+            files_to_cache.append("source.py")  # fetched by the Source page, so keep it offline
+        png_level = 9 if cfg.get("release") else 1
         
-        for size in [192, 512]:
-            (out / f"icon-{size}.png").write_bytes(make_png(size, self.config["theme_color"]))
+        print("  [4/5] Generating HTML...")
+        # The other outputs don't depend on index.html: build and write them on
+        # worker threads (zlib and file I/O release the GIL) while the main
+        # thread streams the pages
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            futs = [ex.submit(lambda s=size: write_if_changed(
+                        out / f"icon-{s}.png", make_png(s, cfg["theme_color"], png_level)))
+                    for size in (192, 512)]
+            futs.append(ex.submit(lambda: write_if_changed(out / "manifest.json", make_manifest(cfg))))
+            futs.append(ex.submit(lambda: write_if_changed(out / "sw.js",
+                make_sw(files_to_cache, cfg["version"], analyzer.source_hash, pretty=bool(cfg.get("pretty"))))))
+            # source.py is the input file itself: link it rather than rewrite it
+            futs.append(ex.submit(link_if_changed, analyzer.file_path, out / "source.py", analyzer.source_bytes))
+            
+            # Pages are generated, optimized and streamed to a sibling file,
+            # which only replaces index.html if the content differs
+            tmp = out / "index.html.new"
+            with open(tmp, "w", encoding="utf-8", buffering=1 << 20) as fh:
+                self.optimizer.optimize_stream(self.generator.iter_chunks(app, cfg), cfg, fh)
+            replace_if_changed(tmp, out / "index.html")
+            
+            print("  [5/5] Writing files...")
+            for f in futs:
+                f.result()
         
-        (out / "source.py").write_text(analyzer.source, encoding="utf-8")
+        self._store_pages(analyzer, pages, nav_html)
         
-        total = sum(f.stat().st_size for f in out.iterdir())
+        with os.scandir(out) as it:
+            total = sum(e.stat().st_size for e in it if e.is_file())
         print(f"\n  ✅ Compiled! {total:,} bytes → ./{self.config['output_dir']}/")
         
         return out
@@ -1216,23 +1750,93 @@ class PyWACompiler:
 # ══════════════════════════════════════════════════════════════════
 #  SERVER FUNCTIONS
 # ══════════════════════════════════════════════════════════════════
-def find_free_port(start=8080):
-    for port in range(start, start + 20):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(("", port))
-                return port
-        except OSError:
-            continue
-    return start
+def _load_asset(path, name):
+    """(mtime_ns, size), content type, raw bytes and gzipped bytes for one file."""
+    import gzip
+    import mimetypes
+    ctype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    with open(path, "rb") as fh:
+        st = os.fstat(fh.fileno())
+        raw = fh.read()
+    return (st.st_mtime_ns, st.st_size), ctype, raw, gzip.compress(raw)
+
+
+def _accepts_gzip(header):
+    """True if an Accept-Encoding header allows gzip (q=0 refuses it)."""
+    for part in (header or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip().lower()
+            if q.startswith("q="):
+                try:
+                    return float(q[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
 
 
-def start_server(directory, port):
-    abs_dir = str(Path(directory).resolve())
-    os.chdir(abs_dir)
+def start_server(directory, port=0):
+    """Serve directory on port (0 or busy -> OS-assigned); the bound port is httpd.server_address[1]."""
+    import http.server
+    import threading
+    
+    # Files are read and gzipped on first request and kept in memory; a
+    # stat per request reloads any file the compiler has rewritten since
+    assets = {}
     
-    handler = http.server.SimpleHTTPRequestHandler
-    httpd = socketserver.TCPServer(("", port), handler)
+    def lookup(url_path):
+        name = "index.html" if url_path == "/" else url_path[1:]
+        if not name or "/" in name or name.startswith("."):
+            return None  # the output directory is flat
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            assets.pop(name, None)
+            return None
+        hit = assets.get(name)
+        if hit is None or hit[0] != (st.st_mtime_ns, st.st_size):
+            try:
+                hit = assets[name] = _load_asset(path, name)
+            except OSError:  # a directory, or removed since the stat
+                return None
+        return hit
+    
+    class MemHandler(http.server.BaseHTTPRequestHandler):
+        def _respond(self, head_only):
+            hit = lookup(self.path.split("?", 1)[0])
+            if hit is None:
+                self.send_error(404)
+                return
+            _, ctype, raw, gz = hit
+            gzipped = _accepts_gzip(self.headers.get("Accept-Encoding"))
+            body = gz if gzipped else raw
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+        
+        def do_GET(self):
+            self._respond(head_only=False)
+        
+        def do_HEAD(self):
+            self._respond(head_only=True)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    # Threaded so the service worker's parallel icon/manifest fetches don't
+    # queue behind each other (HTTPServer already sets allow_reuse_address)
+    try:
+        httpd = http.server.ThreadingHTTPServer(("", port), MemHandler)
+    except OSError:
+        httpd = http.server.ThreadingHTTPServer(("", 0), MemHandler)
     
     thread = threading.Thread(target=httpd.serve_forever, daemon=True)
     thread.start()
@@ -1249,6 +1853,7 @@ def open_browser(url):
         return True
     except:
         try:
+            import webbrowser
             webbrowser.open(url)
             return True
         except:
@@ -1272,6 +1877,8 @@ def main():
     parser.add_argument("--out", help="Output directory", default="pwa_output")
     parser.add_argument("--serve", action="store_true", help="Start web server")
     parser.add_argument("--port", type=int, default=0, help="Port for web server")
+    parser.add_argument("--release", action="store_true", help="Release build (max PNG compression)")
+    parser.add_argument("--pretty", action="store_true", help="Indent generated service worker JSON")
     
     args = parser.parse_args()
     
@@ -1300,7 +1907,9 @@ def main():
         "theme_color": args.color,
         "accent": args.accent,
         "output_dir": args.out,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "release": args.release or None,
+        "pretty": args.pretty or None,
     }
     
     # Remove None values
@@ -1312,11 +1921,10 @@ def main():
     
     # Serve if requested
     if args.serve:
-        port = args.port or find_free_port(8080)
-        url = f"http://localhost:{port}"
+        httpd = start_server(out_dir, args.port or 8080)
+        url = f"http://localhost:{httpd.server_address[1]}"
         
         print(f"\n  🌐 Starting server at {url}")
-        httpd = start_server(out_dir, port)
         
         open_browser(url)
         
@@ -5,23 +5,29 @@ Compiles ANY Python file to an installable Progressive Web App.
 """
 
 import os
+import io
 import sys
 import json
 import ast
-import shutil
 import struct
 import zlib
 import time
 import re
-import hashlib
 import argparse
+import functools
 import subprocess
 import tempfile
 import threading
+import _thread
+import signal
+import runpy
+import traceback
+import contextlib
 import http.server
-import socketserver
 import socket
 import webbrowser
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -143,27 +149,40 @@ def resolve_theme(config):
 #  COMPATIBILITY CHECKER
 # ══════════════════════════════════════════════════════════════════
 class CompatibilityChecker:
+    # Patterns are compiled once here (IGNORECASE baked in); fixers close
+    # over their own compiled patterns instead of re-running re.sub(str, ...)
+    _BLINK = re.compile(r'<blink[^>]*>(.*?)</blink>', re.S)
+    _BLANK = re.compile(r'(target=["\']_blank["\'])(?!.*?rel=)')
+    _IMG = re.compile(r'(<img)(?![^>]*alt=)')
+    
     CHECKS = [
-        (r'<marquee', "❌ <marquee> is deprecated", 
+        (re.compile(r'<marquee', re.I), "❌ <marquee> is deprecated", 
          lambda h: h.replace('<marquee', '<div class="pywa-marquee"')),
-        (r'<blink', "❌ <blink> is deprecated",
-         lambda h: re.sub(r'<blink[^>]*>(.*?)</blink>', r'<span>\1</span>', h, flags=re.S)),
-        (r'target=["\']_blank["\'](?!.*rel=)', "⚠️ _blank without rel=noopener",
-         lambda h: re.sub(r'(target=["\']_blank["\'])(?!.*?rel=)', r'\1 rel="noopener noreferrer"', h)),
-        (r'<img(?!.*?alt=)', "⚠️ <img> missing alt attribute",
-         lambda h: re.sub(r'(<img)(?![^>]*alt=)', r'\1 alt=""', h)),
-        (r'user-scalable=no', "❌ user-scalable=no breaks accessibility",
+        (re.compile(r'<blink', re.I), "❌ <blink> is deprecated",
+         lambda h, p=_BLINK: p.sub(r'<span>\1</span>', h)),
+        (re.compile(r'target=["\']_blank["\'](?!.*rel=)', re.I), "⚠️ _blank without rel=noopener",
+         lambda h, p=_BLANK: p.sub(r'\1 rel="noopener noreferrer"', h)),
+        (re.compile(r'<img(?!.*?alt=)', re.I), "⚠️ <img> missing alt attribute",
+         lambda h, p=_IMG: p.sub(r'\1 alt=""', h)),
+        (re.compile(r'user-scalable=no', re.I), "❌ user-scalable=no breaks accessibility",
          lambda h: h.replace('user-scalable=no', 'user-scalable=yes')),
     ]
     
+    # Cheap superset of every CHECKS pattern: clean documents (the common
+    # case) cost one scan instead of five
+    _FAST_PRESCAN = re.compile(r'<marquee|<blink|target=["\']_blank|<img|user-scalable=no', re.I)
+    
     def check(self, html):
         """Check HTML for compatibility issues and fix them."""
+        if not self._FAST_PRESCAN.search(html):
+            return html, [], []
+        
         issues = []
         fixes = []
         content = html
         
         for pattern, message, fix_fn in self.CHECKS:
-            if re.search(pattern, content, re.IGNORECASE):
+            if pattern.search(content):
                 issues.append(message)
                 if fix_fn:
                     try:
@@ -369,6 +388,20 @@ p { color: var(--color-text-muted); }
 }
 """
     
+    # Placeholders BASE_CSS takes from config (defaults come from DEFAULTS)
+    CSS_VARS = ("bg_color", "theme_color", "accent", "surface", "border",
+                "text", "text_muted", "radius", "font", "shadow")
+    _CSS_VAR_RE = re.compile(r'\{(%s)\}' % '|'.join(CSS_VARS))
+    
+    _BODY_RE = re.compile(r'<body(>|\s+)')
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _render_css(values):
+        """BASE_CSS with placeholders filled from values (in CSS_VARS order) in one pass."""
+        subs = dict(zip(ResponsiveOptimizer.CSS_VARS, values))
+        return ResponsiveOptimizer._CSS_VAR_RE.sub(lambda m: subs[m[1]], ResponsiveOptimizer.BASE_CSS)
+    
     def optimize(self, html, config):
         """Add responsive meta tags and PWA CSS to HTML."""
         
@@ -381,18 +414,8 @@ p { color: var(--color-text-muted); }
         description = f'<meta name="description" content="{config["name"]} — built with PyWA">'
         charset = '<meta charset="UTF-8">'
         
-        # Replace placeholders in CSS
-        css = self.BASE_CSS
-        css = css.replace('{bg_color}', config.get("bg_color", "#ffffff"))
-        css = css.replace('{theme_color}', config.get("theme_color", "#1a1a2e"))
-        css = css.replace('{accent}', config.get("accent", "#e94560"))
-        css = css.replace('{surface}', config.get("surface", "#f5f5f5"))
-        css = css.replace('{border}', config.get("border", "#e0e0e0"))
-        css = css.replace('{text}', config.get("text", "#1a1a1a"))
-        css = css.replace('{text_muted}', config.get("text_muted", "#666666"))
-        css = css.replace('{radius}', config.get("radius", "12px"))
-        css = css.replace('{font}', config.get("font", "'Segoe UI', system-ui, sans-serif"))
-        css = css.replace('{shadow}', config.get("shadow", "0 2px 12px rgba(0,0,0,.08)"))
+        # CSS depends only on the theme values, so it's rendered once per theme
+        css = self._render_css(tuple(config.get(k, DEFAULTS[k]) for k in self.CSS_VARS))
         
         # Build head injection
         head_inject = f"""
@@ -417,10 +440,11 @@ p { color: var(--color-text-muted); }
         theme_name = config.get("theme", "light")
         body_class = f' class="pywa-theme-{theme_name}"'
         
-        if "<body>" in html:
-            html = html.replace("<body>", f"<body{body_class}>", 1)
-        elif "<body " in html:
-            html = re.sub(r'<body\s+', f'<body{body_class} ', html, 1)
+        # One scan for the first <body> / <body ...> tag, then splice the class in
+        m = self._BODY_RE.search(html)
+        if m:
+            sep = ">" if m[1] == ">" else " "
+            html = f"{html[:m.start()]}<body{body_class}{sep}{html[m.end():]}"
         
         return html
 
@@ -428,59 +452,12 @@ p { color: var(--color-text-muted); }
 # ══════════════════════════════════════════════════════════════════
 #  HTML GENERATOR
 # ══════════════════════════════════════════════════════════════════
-class HTMLGenerator:
-    """Generates the final HTML for the PWA."""
-    
-    def generate(self, content, config, content_is_html=False):
-        """Generate complete HTML with navigation."""
-        
-        # Prepare content
-        if content_is_html:
-            main_content = content
-        else:
-            main_content = f'<pre class="terminal-output">{content}</pre>'
-        
-        # Simple navigation
-        nav_links = '<a href="#" onclick="pywaNavigate(\'content\');return false;">App</a>'
-        tab_btns = '''
-      <button class="pywa-tab-btn active" onclick="pywaNavigate('content')" id="tab-content">
-        <span class="tab-icon">📱</span>
-        <span>App</span>
-      </button>'''
-        
-        # Build HTML
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-  <title>{config['name']}</title>
-  <link rel="manifest" href="manifest.json">
-  <meta name="theme-color" content="{config['theme_color']}">
-  <link rel="apple-touch-icon" href="icon-192.png">
-</head>
-<body>
-  <!-- Navbar -->
-  <nav class="pywa-navbar">
-    <span class="pywa-navbar-title">{config['name']}</span>
-    <div class="pywa-navbar-links">
-      {nav_links}
-    </div>
-  </nav>
-
-  <!-- Content -->
-  <div class="pywa-page active" id="page-content">
-    <main class="pywa-main">
-      {main_content}
-    </main>
-  </div>
-
-  <!-- Mobile Navigation -->
-  <div class="pywa-tab-nav">
-    <div class="pywa-tab-nav-inner">
-      {tab_btns}
-    </div>
-  </div>
+# Plain-text output is escaped in one C-level pass before going into <pre>
+_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
 
-  <!-- Install Banner -->
+# Install banner + navigation/install/service-worker JS; identical for every
+# app, so it's a plain constant rather than part of a per-call f-string
+_PAGE_SCRIPT = """  <!-- Install Banner -->
   <div id="pywa-install-banner">
     📱 Install this app
     <button onclick="pywaInstall()">Install</button>
@@ -489,41 +466,102 @@ class HTMLGenerator:
 
   <script>
     // Navigation
-    function pywaNavigate(page) {{
+    function pywaNavigate(page) {
       document.querySelectorAll('.pywa-page').forEach(p => p.classList.remove('active'));
       document.querySelectorAll('.pywa-tab-btn').forEach(b => b.classList.remove('active'));
       const pg = document.getElementById('page-' + page);
       const tb = document.getElementById('tab-' + page);
       if (pg) pg.classList.add('active');
       if (tb) tb.classList.add('active');
-    }}
+    }
 
     // PWA Install
     let pywaInstallEvent = null;
-    window.addEventListener('beforeinstallprompt', e => {{
+    window.addEventListener('beforeinstallprompt', e => {
       e.preventDefault();
       pywaInstallEvent = e;
       document.getElementById('pywa-install-banner').classList.add('show');
-    }});
+    });
 
-    function pywaInstall() {{
+    function pywaInstall() {
       if (!pywaInstallEvent) return;
       pywaInstallEvent.prompt();
-      pywaInstallEvent.userChoice.then(() => {{
+      pywaInstallEvent.userChoice.then(() => {
         pywaInstallEvent = null;
         document.getElementById('pywa-install-banner').classList.remove('show');
-      }});
-    }}
+      });
+    }
 
     // Service Worker
-    if ('serviceWorker' in navigator) {{
+    if ('serviceWorker' in navigator) {
       navigator.serviceWorker.register('sw.js')
         .then(() => console.log('[PyWA] Service worker ready'))
         .catch(e => console.warn('[PyWA] SW error', e));
-    }}
+    }
   </script>
 </body>
 </html>"""
+
+
+# Page shell (including the single-page nav) filled by HTMLGenerator.generate
+# via str.format_map. The script is substituted in as {page_script}, so its
+# braces need no doubling
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <title>{name}</title>
+  <link rel="manifest" href="manifest.json">
+  <meta name="theme-color" content="{theme_color}">
+  <link rel="apple-touch-icon" href="icon-192.png">
+</head>
+<body>
+  <!-- Navbar -->
+  <nav class="pywa-navbar">
+    <span class="pywa-navbar-title">{name}</span>
+    <div class="pywa-navbar-links">
+      <a href="#" onclick="pywaNavigate('content');return false;">App</a>
+    </div>
+  </nav>
+
+  <!-- Content -->
+  <div class="pywa-page active" id="page-content">
+    <main class="pywa-main">
+      {main_content}
+    </main>
+  </div>
+
+  <!-- Mobile Navigation -->
+  <div class="pywa-tab-nav">
+    <div class="pywa-tab-nav-inner">
+      
+      <button class="pywa-tab-btn active" onclick="pywaNavigate('content')" id="tab-content">
+        <span class="tab-icon">📱</span>
+        <span>App</span>
+      </button>
+    </div>
+  </div>
+
+{page_script}"""
+
+
+class HTMLGenerator:
+    """Generates the final HTML for the PWA."""
+    
+    def generate(self, content, config, content_is_html=False):
+        """Generate complete HTML with navigation."""
+        
+        # Prepare content
+        if content_is_html:
+            main_content = content
+        else:
+            main_content = f'<pre class="terminal-output">{content.translate(_ESCAPE_TABLE)}</pre>'
+        
+        # One format_map over the module-level template; config supplies
+        # name/theme_color, the rest comes from here
+        html = _HTML_TEMPLATE.format_map(ChainMap({
+            'main_content': main_content,
+            'page_script': _PAGE_SCRIPT,
+        }, config))
         
         return html
 
@@ -531,15 +569,14 @@ class HTMLGenerator:
 # ══════════════════════════════════════════════════════════════════
 #  ASSET GENERATORS
 # ══════════════════════════════════════════════════════════════════
+@functools.lru_cache(maxsize=16)
 def make_png(size, hex_color):
-    """Generate a simple PNG icon."""
+    """Generate a simple PNG icon (memoized: same size and colour -> same bytes)."""
     r, g, b = int(hex_color[1:3], 16), int(hex_color[3:5], 16), int(hex_color[5:7], 16)
-    raw = b""
-    for _ in range(size):
-        row = b"\x00"
-        for _ in range(size):
-            row += bytes([r, g, b, 255])
-        raw += row
+    # Solid colour: each scanline is filter byte 0 + the pixel repeated, and
+    # the image is that row repeated (bytes * n replicates in C)
+    row = b"\x00" + bytes((r, g, b, 255)) * size
+    raw = row * size
     
     def chunk(name, data):
         crc = zlib.crc32(name + data) & 0xFFFFFFFF
@@ -573,7 +610,9 @@ def make_manifest(config):
 def make_sw(file_list, version):
     """Generate service worker for offline support."""
     files = json.dumps(file_list, indent=4)
-    return f"""const CACHE = 'pywa-{version}-{hashlib.md5(version.encode()).hexdigest()[:6]}';
+    # Cache-busting suffix only: a CRC is plenty, no need for a crypto hash
+    tag = f"{zlib.crc32(version.encode()) & 0xFFFFFF:06x}"
+    return f"""const CACHE = 'pywa-{version}-{tag}';
 const FILES = {files};
 
 self.addEventListener('install', e => {{
@@ -614,15 +653,91 @@ self.addEventListener('fetch', e => {{
 class PythonRunner:
     """Runs Python file and captures its output."""
     
+    TIMEOUT = 30
+    
+    @staticmethod
+    def run_in_process(file_path):
+        """Run Python file in this interpreter with stdout/stderr captured.
+        
+        Skips interpreter startup; use run_and_capture for isolation."""
+        out, err = io.StringIO(), io.StringIO()
+        returncode = 0
+        timed_out = threading.Event()
+        finished = cut_short = False
+        main_ident = threading.get_ident()
+        
+        def on_timeout():
+            timed_out.set()
+            # A real SIGINT also wakes blocking calls like time.sleep();
+            # interrupt_main() only takes effect at the next bytecode
+            if hasattr(signal, "pthread_kill"):
+                signal.pthread_kill(main_ident, signal.SIGINT)
+            else:
+                _thread.interrupt_main()
+        
+        watchdog = threading.Timer(PythonRunner.TIMEOUT, on_timeout)
+        # The script shares our process state; put back whatever it may change
+        saved_argv, saved_path, saved_cwd = sys.argv[:], sys.path[:], os.getcwd()
+        sys.argv = [str(file_path)]
+        sys.path.insert(0, str(Path(file_path).resolve().parent))
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                watchdog.start()
+                try:
+                    try:
+                        runpy.run_path(str(file_path), run_name="__main__")
+                    except SystemExit as e:
+                        if isinstance(e.code, int):
+                            returncode = e.code
+                        elif e.code is not None:
+                            print(e.code, file=sys.stderr)
+                            returncode = 1
+                    except KeyboardInterrupt:
+                        if not timed_out.is_set():
+                            raise
+                        cut_short = True
+                    except Exception as e:
+                        # Report from the script's first frame, as `python script.py` would
+                        tb = e.__traceback__
+                        while tb is not None and tb.tb_frame.f_code.co_filename != str(file_path):
+                            tb = tb.tb_next
+                        traceback.print_exception(type(e), e, tb or e.__traceback__)
+                        returncode = 1
+                    finished = True
+                finally:
+                    # cancel() doesn't stop a callback that is already running;
+                    # join so its SIGINT lands in this try, not after we return
+                    watchdog.cancel()
+                    watchdog.join()
+        except KeyboardInterrupt:
+            # The watchdog fired: either mid-run (outside the script's own
+            # frames) or just after the script had already finished
+            if not timed_out.is_set():
+                raise
+            cut_short = cut_short or not finished
+        finally:
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            os.chdir(saved_cwd)
+        
+        if cut_short:
+            return f"Error: Execution timed out ({PythonRunner.TIMEOUT} seconds)", False, 1
+        
+        output = out.getvalue()
+        errors = err.getvalue()
+        if errors:
+            output += "\n" + errors if output else errors
+        
+        return output, PythonRunner._is_html(output), returncode
+    
     @staticmethod
     def run_and_capture(file_path):
-        """Run Python file and capture stdout/stderr."""
+        """Run Python file in a subprocess and capture stdout/stderr."""
         try:
             result = subprocess.run(
                 [sys.executable, str(file_path)],
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=PythonRunner.TIMEOUT
             )
             
             output = result.stdout
@@ -635,42 +750,32 @@ class PythonRunner:
             return output, is_html, result.returncode
             
         except subprocess.TimeoutExpired:
-            return "Error: Execution timed out (30 seconds)", False, 1
+            return f"Error: Execution timed out ({PythonRunner.TIMEOUT} seconds)", False, 1
         except Exception as e:
             return f"Error: {str(e)}", False, 1
     
+    # Any of these anywhere in the output means it should be rendered as HTML
+    _HTML_RE = re.compile(r'<html|<!doctype|<body|<head|<div|<script|<svg|Plotly\.newPlot', re.I)
+    
     @staticmethod
     def _is_html(text):
         """Check if text contains HTML."""
-        html_patterns = [
-            r'<html',
-            r'<!DOCTYPE',
-            r'<body',
-            r'<head',
-            r'<div',
-            r'<script',
-            r'Plotly\.newPlot',
-            r'<svg',
-        ]
-        text_lower = text.lower()
-        for pattern in html_patterns:
-            if re.search(pattern, text_lower):
-                return True
-        return False
+        return PythonRunner._HTML_RE.search(text) is not None
 
 
 # ══════════════════════════════════════════════════════════════════
 #  FILE PICKER
 # ══════════════════════════════════════════════════════════════════
+# PyWA's own scripts, never offered as compile targets
+_EXCLUDE = frozenset({"pywa.py", "pywa_v0p2.py", "pywa_v0p3.py", "pywa_v0p4.py"})
+
+
 def pick_py_file():
     """Simple file picker."""
     base = Path.cwd()
     print(f"\n  🔍 Searching for Python files in: {base}")
     
-    found = []
-    for f in base.glob("*.py"):
-        if f.name not in ["pywa.py", "pywa_v0p2.py", "pywa_v0p3.py"]:
-            found.append(f)
+    found = [f for f in base.glob("*.py") if f.name not in _EXCLUDE]
     
     if not found:
         print(f"\n  ❌ No Python files found in current directory")
@@ -705,24 +810,34 @@ def pick_py_file():
 # ══════════════════════════════════════════════════════════════════
 #  SERVER FUNCTIONS
 # ══════════════════════════════════════════════════════════════════
-def find_free_port(start=8080):
-    """Find a free port starting from start."""
-    for port in range(start, start + 20):
+def find_free_port(start=None):
+    """Free port: start if it can be bound, else one assigned by the OS."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(("", port))
-                return port
+            s.bind(("", start or 0))
         except OSError:
-            continue
-    return start
+            s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+class _PWARequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Explicit JS type so browsers register sw.js without sniffing
+    extensions_map = {**http.server.SimpleHTTPRequestHandler.extensions_map,
+                      ".js": "application/javascript"}
 
 
 def start_server(directory, port):
     """Start HTTP server in current thread."""
-    os.chdir(directory)
-    
-    handler = http.server.SimpleHTTPRequestHandler
-    httpd = socketserver.TCPServer(("", port), handler)
+    # Serve directory without changing the process's working directory
+    handler = functools.partial(_PWARequestHandler, directory=str(Path(directory).resolve()))
+    # Threaded, so the service worker's parallel pre-cache fetches don't
+    # queue. Reuse the address so restarting right after Ctrl+C doesn't hit
+    # TIME_WAIT
+    httpd = http.server.ThreadingHTTPServer(("", port), handler, bind_and_activate=False)
+    httpd.allow_reuse_address = True
+    httpd.server_bind()
+    httpd.server_activate()
     
     print(f"\n  🌐 Server running at http://localhost:{port}")
     print("  Press Ctrl+C to stop\n")
@@ -751,6 +866,22 @@ def open_browser(url):
             return False
 
 
+# ══════════════════════════════════════════════════════════════════
+#  OUTPUT WRITING - rebuilds touch only files whose bytes changed
+# ══════════════════════════════════════════════════════════════════
+def write_if_changed(path, data):
+    """Write str/bytes to path unless it already holds exactly that; returns the size in bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return len(data)
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return len(data)
+
+
 # ══════════════════════════════════════════════════════════════════
 #  PYWA COMPILER
 # ══════════════════════════════════════════════════════════════════
@@ -779,7 +910,10 @@ class PyWACompiler:
         
         # Step 1: Run Python file and capture output
         print("  [1/4] Running Python file...")
-        output, is_html, returncode = PythonRunner.run_and_capture(src)
+        if self.config.get("subprocess"):
+            output, is_html, returncode = PythonRunner.run_and_capture(src)
+        else:
+            output, is_html, returncode = PythonRunner.run_in_process(src)
         
         if returncode != 0:
             print(f"  ⚠️  Script exited with code {returncode}")
@@ -808,34 +942,37 @@ class PyWACompiler:
         
         # Step 5: Write files
         print("  [4/4] Writing PWA files...")
+        # Update in place: unchanged files (usually the icons, manifest and
+        # sw.js) are compared, not rewritten, and keep their mtimes
         out_dir = Path(self.config["output_dir"])
-        if out_dir.exists():
-            shutil.rmtree(out_dir)
-        out_dir.mkdir(parents=True)
+        out_dir.mkdir(parents=True, exist_ok=True)
         
-        # Write HTML
-        (out_dir / "index.html").write_text(html, encoding="utf-8")
-        print("     ✅ index.html")
-        
-        # Write manifest
-        (out_dir / "manifest.json").write_text(make_manifest(self.config))
-        print("     ✅ manifest.json")
-        
-        # Write service worker
+        cfg = self.config
         files_to_cache = ["index.html", "manifest.json", "icon-192.png", "icon-512.png"]
-        (out_dir / "sw.js").write_text(make_sw(files_to_cache, self.config["version"]))
-        print("     ✅ sw.js")
-        
-        # Generate icons
-        for size in [192, 512]:
-            (out_dir / f"icon-{size}.png").write_bytes(make_png(size, self.config["theme_color"]))
-        print("     ✅ icons")
         
-        # Copy source for reference
-        (out_dir / "source.py").write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
+        # The artifacts are independent: build and write them on worker
+        # threads (zlib for the 512px icon and file I/O release the GIL)
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            jobs = [
+                ("index.html", ex.submit(write_if_changed, out_dir / "index.html", html)),
+                ("manifest.json", ex.submit(lambda: write_if_changed(
+                    out_dir / "manifest.json", make_manifest(cfg)))),
+                ("sw.js", ex.submit(lambda: write_if_changed(
+                    out_dir / "sw.js", make_sw(files_to_cache, cfg["version"])))),
+                ("icons", [ex.submit(lambda size=size: write_if_changed(
+                    out_dir / f"icon-{size}.png", make_png(size, cfg["theme_color"])))
+                    for size in (192, 512)]),
+                # Copy source for reference (bytes as-is: no decode/encode round trip)
+                (None, ex.submit(lambda: write_if_changed(out_dir / "source.py", src.read_bytes()))),
+            ]
+            # Sizes come back from the writes, so no directory walk afterwards
+            total_size = 0
+            for label, job in jobs:
+                for f in (job if isinstance(job, list) else [job]):
+                    total_size += f.result()
+                if label:
+                    print(f"     ✅ {label}")
         
-        # Calculate total size
-        total_size = sum(f.stat().st_size for f in out_dir.glob("**/*") if f.is_file())
         print(f"\n  ✅ Compiled! {total_size:,} bytes → ./{self.config['output_dir']}/")
         
         return out_dir
@@ -859,6 +996,7 @@ def main():
     parser.add_argument("--serve", action="store_true", help="Start web server after compile")
     parser.add_argument("--port", type=int, default=8080, help="Port for web server")
     parser.add_argument("--open", action="store_true", help="Open in browser after compile")
+    parser.add_argument("--subprocess", action="store_true", help="Run the script in a separate interpreter (isolated, slower)")
     
     args = parser.parse_args()
     
@@ -878,7 +1016,8 @@ def main():
         "theme_color": args.color,
         "accent": args.accent,
         "output_dir": args.out,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "subprocess": args.subprocess or None,
     }
     
     # Remove None values
@@ -0,0 +1,87 @@
+"""
+Numeric kernels for the SectorIndex dashboard.
+
+Plain-loop implementations so Numba can compile them. Build the shared
+object once with:
+
+    python sector_kernels.py
+
+which writes _sector_kernels.<platform>.so next to this file. SectorIndexv9
+imports that AOT module directly (no JIT warmup on each run) and falls back
+to numba.njit over these functions, then to its own numpy/pandas code.
+"""
+
+import os
+import numpy as np
+
+
+def rsi_wilder(close, period):
+    """RSI with Wilder smoothing (alpha = 1/period); 50 where undefined."""
+    n = close.shape[0]
+    out = np.full(n, 50.0)
+    alpha = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    started = False
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        if delta != delta:
+            continue
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if not started:
+            avg_gain = gain
+            avg_loss = loss
+            started = True
+        else:
+            avg_gain += alpha * (gain - avg_gain)
+            avg_loss += alpha * (loss - avg_loss)
+        if avg_loss > 0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def detect_reversals(closes, sma50, lookback, threshold):
+    """
+    Percent move at each SMA50 direction change that clears `threshold`,
+    measured from the lowest (bullish) / highest (bearish) close of the
+    trailing `lookback` bars. NaN everywhere else.
+    """
+    n = closes.shape[0]
+    moves = np.full(n, np.nan)
+    prev_dir = 0
+    for i in range(1, n):
+        slope = sma50[i] - sma50[i - 1]
+        cur_dir = 1 if slope > 0 else (-1 if slope < 0 else 0)
+        if cur_dir != prev_dir and cur_dir != 0:
+            lo = np.inf
+            hi = -np.inf
+            for j in range(max(0, i - lookback + 1), i + 1):
+                c = closes[j]
+                if c == c:
+                    if c < lo:
+                        lo = c
+                    if c > hi:
+                        hi = c
+            close = closes[i]
+            if cur_dir > 0 and lo != np.inf:
+                move = (close - lo) / lo * 100
+                if move >= threshold:
+                    moves[i] = move
+            elif cur_dir < 0 and hi != -np.inf:
+                move = (close - hi) / hi * 100
+                if move <= -threshold:
+                    moves[i] = move
+        prev_dir = cur_dir
+    return moves
+
+
+if __name__ == "__main__":
+    from numba.pycc import CC
+
+    cc = CC('_sector_kernels')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export('rsi_wilder', 'f8[:](f8[:], i4)')(rsi_wilder)
+    cc.export('detect_reversals', 'f8[:](f8[:], f8[:], i4, f8)')(detect_reversals)
+    cc.compile()
+    print(f"Built _sector_kernels in {cc.output_dir}")
@@ -0,0 +1,89 @@
+"""Regression tests for pywa_v0p4 (run: python -m unittest zz_Legacy/test_pywa_v0p4.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+import contextlib
+import io
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "pywa_v0p4", Path(__file__).with_name("pywa_v0p4.py"))
+pywa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pywa)
+
+
+class RunInProcessTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self.work = tempfile.TemporaryDirectory()
+        self.elsewhere = tempfile.TemporaryDirectory()
+        os.chdir(self.work.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self.work.cleanup()
+        self.elsewhere.cleanup()
+
+    def test_script_chdir_does_not_leak(self):
+        Path("chdir_app.py").write_text(
+            f"import os\nos.chdir({self.elsewhere.name!r})\nprint('moved')\n")
+        before = os.getcwd()
+        output, is_html, rc = pywa.PythonRunner.run_in_process("chdir_app.py")
+        self.assertEqual((output, is_html, rc), ("moved\n", False, 0))
+        self.assertEqual(os.getcwd(), before)
+
+    def test_compile_with_chdir_script_writes_relative_output(self):
+        Path("chdir_app.py").write_text(
+            f"import os\nos.chdir({self.elsewhere.name!r})\nprint('moved')\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = pywa.PyWACompiler({"output_dir": "out"}).compile("chdir_app.py")
+        self.assertEqual(out.resolve(), Path(self.work.name, "out").resolve())
+        self.assertEqual((out / "source.py").read_bytes(), Path("chdir_app.py").read_bytes())
+        self.assertFalse(Path(self.elsewhere.name, "out").exists())
+
+    def test_argv_and_path_restored(self):
+        Path("argv_app.py").write_text("import sys\nsys.argv.append('x')\nsys.path.append('/nowhere')\n")
+        argv, path = sys.argv[:], sys.path[:]
+        pywa.PythonRunner.run_in_process("argv_app.py")
+        self.assertEqual((sys.argv, sys.path), (argv, path))
+
+
+class RunInProcessTimeoutTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._timeout = pywa.PythonRunner.TIMEOUT
+        pywa.PythonRunner.TIMEOUT = 0.2
+        self.work = tempfile.TemporaryDirectory()
+        os.chdir(self.work.name)
+
+    def tearDown(self):
+        pywa.PythonRunner.TIMEOUT = self._timeout
+        os.chdir(self._cwd)
+        self.work.cleanup()
+
+    def test_long_run_times_out(self):
+        Path("slow_app.py").write_text("import time\nprint('start')\ntime.sleep(5)\n")
+        output, is_html, rc = pywa.PythonRunner.run_in_process("slow_app.py")
+        self.assertTrue(output.startswith("Error: Execution timed out"))
+        self.assertEqual((is_html, rc), (False, 1))
+
+    def test_script_that_survives_the_interrupt_keeps_its_output(self):
+        Path("patient_app.py").write_text(
+            "import time\n"
+            "try:\n    time.sleep(5)\nexcept KeyboardInterrupt:\n    print('caught')\n"
+            "print('done')\n")
+        output, is_html, rc = pywa.PythonRunner.run_in_process("patient_app.py")
+        self.assertEqual((output, is_html, rc), ("caught\ndone\n", False, 0))
+
+    def test_fast_run_after_a_timeout_is_not_a_timeout(self):
+        Path("slow_app.py").write_text("import time\ntime.sleep(5)\n")
+        Path("fast_app.py").write_text("print('hi')\n")
+        pywa.PythonRunner.run_in_process("slow_app.py")
+        self.assertEqual(pywa.PythonRunner.run_in_process("fast_app.py"), ("hi\n", False, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()